@@ -0,0 +1,86 @@
+"""
+Perbandingan IsolationForest Cell 8 (langsung pada 5004 kolom sparse) vs
+ProjectedIsolationForest (anomaly.py: SVD / random projection + IsolationForest
+pada representasi padat): waktu fit, waktu scoring, memori puncak, ukuran
+model, dan kemiripan peringkat skor anomali.
+
+    python benchmarks/bench_anomaly.py -n 50000
+    python benchmarks/bench_anomaly.py -n 50000 --components 16 32 64
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+from scipy.stats import spearmanr  # noqa: E402
+from sklearn.ensemble import IsolationForest  # noqa: E402
+
+from anomaly import ProjectedIsolationForest  # noqa: E402
+from benchmarks.synthetic import make_bodies  # noqa: E402
+from feature_pipeline import FeaturePipeline  # noqa: E402
+from model_registry import ModelRegistry  # noqa: E402
+
+
+def measure(fn):
+    """(hasil, detik, MB puncak yang dialokasikan selama fn). Waktu diukur tanpa tracemalloc."""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def single_latency(model, X, repeat=50):
+    """Latency scoring satu pesan (seperti scan Threat Scanner), dalam mikrodetik."""
+    start = time.perf_counter()
+    for i in range(repeat):
+        model.decision_function(X[i:i + 1])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', type=int, default=20000, help='jumlah email latih (scoring memakai n/4)')
+    parser.add_argument('--components', type=int, nargs='+', default=[32])
+    parser.add_argument('--estimators', type=int, default=100)
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    pipeline = FeaturePipeline(registry.get('vectorizer'), registry.get('scaler'))
+    bodies = make_bodies(args.n + args.n // 4)
+    X = pipeline.transform(bodies)
+    X_train, X_test = X[:args.n], X[args.n:]
+    print(f"[INFO] Fitur: {X_train.shape[0]:,} latih, {X_test.shape[0]:,} uji, {X.shape[1]:,} kolom")
+
+    models = [('full sparse', lambda: IsolationForest(n_estimators=args.estimators, contamination=0.05,
+                                                      random_state=42))]
+    for k in args.components:
+        for projection in ('svd', 'random'):
+            models.append((f'{projection} k={k}', lambda k=k, p=projection: ProjectedIsolationForest(
+                n_components=k, projection=p, n_estimators=args.estimators, contamination=0.05, random_state=42)))
+
+    print(f"\n{'model':<14} | {'fit s':>7} | {'fit MB':>7} | {'batch us/msg':>12} | {'1 msg us':>9} | "
+          f"{'score MB':>8} | {'model KB':>9} | {'spearman':>8}")
+    print('-' * 98)
+    reference = None
+    for name, make in models:
+        model, fit_s, fit_mb = measure(lambda: make().fit(X_train))
+        scores, score_s, score_mb = measure(lambda: -model.decision_function(X_test))
+        size_kb = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1e3
+        if reference is None:
+            reference = scores
+        rho = spearmanr(reference, scores).statistic
+        print(f"{name:<14} | {fit_s:>7.2f} | {fit_mb:>7.1f} | {score_s / X_test.shape[0] * 1e6:>12.1f} | "
+              f"{single_latency(model, X_test):>9,.0f} | {score_mb:>8.1f} | {size_kb:>9,.0f} | {rho:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Perbandingan waktu feature engineering Cell 2: versi per baris (apply/lambda)
+vs versi tervektorisasi di features.py, sekaligus memastikan output identik.
+
+    python benchmarks/bench_features.py -n 100000
+    python benchmarks/bench_features.py -n 100000 --dup-rate 0.5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.synthetic import make_bodies  # noqa: E402
+from features import (LABEL_COLUMNS, caps_ratio, clean_text, clean_text_fast,  # noqa: E402
+                      create_warning_label, load_stop_words, warning_labels, weekend_flag)
+
+
+def make_frame(n, dup_rate=0.0):
+    # dup_rate: proporsi baris yang merupakan salinan email lain (Enron memiliki banyak duplikat)
+    unique = make_bodies(max(1, int(n * (1 - dup_rate))))
+    bodies = (unique * (n // len(unique) + 1))[:n]
+    dates = pd.date_range('2000-01-01', periods=n, freq='37min', tz='UTC')
+    return pd.DataFrame({'subject': [f"Re: report {i}" for i in range(n)], 'body': bodies, 'date': dates})
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', type=int, default=100000)
+    parser.add_argument('--dup-rate', type=float, default=0.0, help='proporsi body duplikat (0..1)')
+    args = parser.parse_args()
+
+    # Benchmark boleh berjalan offline: daftar sklearn (dengan warning) bila korpus NLTK tidak ada
+    stop_words = load_stop_words(fallback=True)
+    df = make_frame(args.n, args.dup_rate)
+
+    cases = [
+        ('labels (warning + flags)',
+         lambda: df.apply(create_warning_label, axis=1).set_axis(LABEL_COLUMNS, axis=1),
+         lambda: warning_labels(df)),
+        ('is_weekend',
+         lambda: df['date'].dt.dayofweek.apply(lambda x: 1 if x >= 5 else 0),
+         lambda: weekend_flag(df['date'])),
+        ('body_len',
+         lambda: df['body'].apply(len),
+         lambda: df['body'].str.len()),
+        ('caps_ratio',
+         lambda: df['body'].apply(lambda x: sum(1 for c in str(x) if c.isupper()) / len(x) if len(x) > 0 else 0),
+         lambda: caps_ratio(df['body'])),
+        ('clean_text',
+         lambda: df['body'].apply(lambda t: clean_text_fast(t, stop_words)),
+         lambda: clean_text(df['body'], stop_words)),
+    ]
+
+    print(f"[INFO] {args.n:,} baris sintetis, {df['body'].nunique():,} body unik")
+    print(f"{'feature':<26} | {'row-wise (s)':>12} | {'vectorized (s)':>14} | {'speedup':>7} | identical")
+    print('-' * 80)
+    total_legacy = total_vec = 0.0
+    for name, legacy_fn, vec_fn in cases:
+        legacy, t_legacy = timed(legacy_fn)
+        vec, t_vec = timed(vec_fn)
+        total_legacy += t_legacy
+        total_vec += t_vec
+        same = legacy.equals(vec)
+        print(f"{name:<26} | {t_legacy:>12.2f} | {t_vec:>14.2f} | {t_legacy / t_vec:>6.1f}x | {same}")
+        if not same:
+            raise SystemExit(f"[ERROR] output '{name}' berbeda")
+    print('-' * 80)
+    print(f"{'total':<26} | {total_legacy:>12.2f} | {total_vec:>14.2f} | {total_legacy / total_vec:>6.1f}x |")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark biaya per pesan: PremiumThreatEngine.predict (loop) vs predict_many (batch).
+
+    python benchmarks/bench_predict_many.py
+    python benchmarks/bench_predict_many.py --sizes 1 64 1024 65536 --loop-cap 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_bodies  # noqa: E402
+from threat_engine import PremiumThreatEngine  # noqa: E402
+
+
+def time_per_message(fn, n_messages, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / n_messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 64, 1024, 65536])
+    parser.add_argument('--loop-cap', type=int, default=2000,
+                        help='jumlah maksimum pesan untuk loop predict() (biaya per pesan diekstrapolasi)')
+    args = parser.parse_args()
+
+    # Tanpa cache hasil: setiap repeat harus benar-benar menjalankan model
+    engine = PremiumThreatEngine(cache_size=0, blocklist=False)
+    texts = make_bodies(max(args.sizes))
+    engine.predict_many(texts[:8])  # warm-up
+
+    print(f"{'batch':>8} | {'predict() us/msg':>17} | {'predict_many() us/msg':>22} | {'speedup':>8}")
+    print('-' * 65)
+    for size in args.sizes:
+        batch = texts[:size]
+        loop_n = min(size, args.loop_cap)
+        repeat = 3 if size <= 1024 else 1
+        loop_cost = time_per_message(lambda: [engine.predict(t) for t in batch[:loop_n]], loop_n, repeat)
+        batch_cost = time_per_message(lambda: engine.predict_many(batch), size, repeat)
+        print(f"{size:>8} | {loop_cost * 1e6:>17.1f} | {batch_cost * 1e6:>22.1f} | {loop_cost / batch_cost:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
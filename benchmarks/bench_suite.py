@@ -0,0 +1,199 @@
+"""
+Suite benchmark reprodusibel untuk seluruh jalur: ingest, fitur, scoring, dan
+mitigasi, pada korpus RFC-822 sintetis berbentuk emails.csv (offline, tanpa
+dataset Kaggle).
+
+Setiap ukuran korpus membuat emails.csv sintetis (seed tetap) lalu mengukur:
+
+    csv_read              pd.read_csv emails.csv
+    parse_raw_message     parsing per email (Cell 1)
+    create_warning_label  label per baris via df.apply (Cell 2)
+    warning_labels        label tervektorisasi (features.py)
+    clean_text_fast       clean_text per baris (Cell 2)
+    clean_text            clean_text tervektorisasi (features.py)
+    vectorizer_transform  TF-IDF transform (tfidf_vec_final.pkl)
+    engine_predict        PremiumThreatEngine.predict per email (Threat Scanner)
+    engine_predict_many   PremiumThreatEngine.predict_many satu batch (Bulk Analysis)
+    soar                  soar.run_mitigation (Cell 10 / Bulk Analysis)
+
+Tahap per baris dibatasi `--loop-cap` email (biaya per email diekstrapolasi).
+Hasil (us/email, email/detik, lingkungan) ditulis ke JSON (default
+benchmarks/last_run.json); `--compare` membandingkan dengan baseline dan exit
+code 1 bila ada tahap yang lebih lambat dari toleransi. Baseline referensi
+(benchmarks/baseline.json) hanya diperbarui bila diminta lewat `--out`.
+
+    python benchmarks/bench_suite.py --compare benchmarks/baseline.json    # -> benchmarks/last_run.json
+    python benchmarks/bench_suite.py --out benchmarks/baseline.json        # perbarui baseline
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.synthetic import write_emails_csv  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUT = os.path.join(ROOT, 'benchmarks', 'last_run.json')
+STAGES = ['csv_read', 'parse_raw_message', 'create_warning_label', 'warning_labels', 'clean_text_fast',
+          'clean_text', 'vectorizer_transform', 'engine_predict', 'engine_predict_many', 'soar']
+
+
+def best_of(fn, repeat):
+    """(hasil, detik terbaik dari `repeat` kali)."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def environment():
+    import sklearn
+    import xgboost
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__, 'sklearn': sklearn.__version__,
+                     'xgboost': xgboost.__version__},
+        'git_commit': commit,
+    }
+
+
+def run_size(n, engine, stop_words, workdir, seed=42, repeat=3, loop_cap=2000):
+    """Dict tahap -> {seconds, rows, us_per_msg, msg_per_s} untuk korpus n email."""
+    from bulk_analysis import DEFAULT_POLICY
+    from email_ingest import parse_raw_message
+    from features import clean_text, clean_text_fast, create_warning_label, warning_labels
+    from soar import run_mitigation
+
+    path = write_emails_csv(os.path.join(workdir, f'emails_{n}.csv'), n, seed)
+    results = {}
+
+    def record(stage, fn, rows):
+        value, seconds = best_of(fn, repeat)
+        # Tahap per baris hanya dijalankan pada `rows` email; biaya per email diekstrapolasi ke n
+        per_msg = seconds / rows
+        results[stage] = {'seconds': round(per_msg * n, 6), 'rows': rows,
+                          'us_per_msg': round(per_msg * 1e6, 3), 'msg_per_s': round(1 / per_msg, 1)}
+        return value
+
+    capped = min(n, loop_cap)
+    emails = record('csv_read', lambda: pd.read_csv(path), n)
+    messages = emails['message'].tolist()
+
+    parsed = record('parse_raw_message', lambda: pd.DataFrame([parse_raw_message(m) for m in messages]), n)
+    record('create_warning_label', lambda: parsed.head(capped).apply(create_warning_label, axis=1), capped)
+    record('warning_labels', lambda: warning_labels(parsed), n)
+
+    bodies = parsed['body'].tolist()
+    record('clean_text_fast', lambda: [clean_text_fast(b, stop_words) for b in bodies[:capped]], capped)
+    cleaned = record('clean_text', lambda: clean_text(parsed['body'], stop_words), n)
+
+    record('vectorizer_transform', lambda: engine.vectorizer.transform(cleaned), n)
+    record('engine_predict', lambda: [engine.predict(m) for m in messages[:capped]], capped)
+    record('engine_predict_many', lambda: engine.predict_many(messages), n)
+
+    _, xgb_prob, iso_score = engine.score_many(messages)
+    record('soar', lambda: run_mitigation(xgb_prob, iso_score, cleaned, parsed['body'], DEFAULT_POLICY), n)
+    os.remove(path)
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Cetak perbandingan us/email per tahap. Return jumlah regresi (lebih lambat > tolerance)."""
+    regressions = 0
+    print(f"\n{'size':>8} | {'stage':<22} | {'baseline us':>12} | {'current us':>12} | {'ratio':>7}")
+    print('-' * 74)
+    for size, stages in current['results'].items():
+        for stage, result in stages.items():
+            base = baseline.get('results', {}).get(size, {}).get(stage)
+            if base is None:
+                continue
+            ratio = result['us_per_msg'] / base['us_per_msg'] if base['us_per_msg'] else float('inf')
+            flag = ''
+            if ratio > 1 + tolerance:
+                flag = '  REGRESSION'
+                regressions += 1
+            print(f"{size:>8} | {stage:<22} | {base['us_per_msg']:>12,.1f} | {result['us_per_msg']:>12,.1f} | "
+                  f"{ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--loop-cap', type=int, default=2000,
+                        help='jumlah maksimum email untuk tahap per baris (biaya per email diekstrapolasi)')
+    parser.add_argument('--out', default=DEFAULT_OUT, help='file JSON hasil')
+    parser.add_argument('--compare', default=None, help='JSON baseline untuk dibandingkan')
+    parser.add_argument('--tolerance', type=float, default=0.20, help='batas perlambatan relatif (0.20 = 20%%)')
+    args = parser.parse_args()
+
+    # Baseline dibaca sebelum apa pun ditulis; hasil run tidak boleh menimpa file pembandingnya
+    baseline = None
+    if args.compare:
+        if os.path.exists(args.out) and os.path.samefile(args.out, args.compare):
+            parser.error('--out dan --compare menunjuk file yang sama; hasil run akan menimpa baseline')
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    from features import load_stop_words
+    from threat_engine import PremiumThreatEngine
+
+    # Tanpa cache hasil dan blocklist: setiap repeat harus benar-benar menjalankan model
+    engine = PremiumThreatEngine(cache_size=0, blocklist=False)
+    engine.predict_many(['warm-up'] * 8)
+    # Benchmark boleh berjalan offline: daftar sklearn (dengan warning) bila korpus NLTK tidak ada
+    stop_words = load_stop_words(fallback=True)
+
+    report = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'config': {'sizes': args.sizes, 'seed': args.seed, 'repeat': args.repeat, 'loop_cap': args.loop_cap,
+                   'model_source': engine.source},
+        'results': {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            print(f"[INFO] Korpus sintetis {n:,} email...")
+            results = run_size(n, engine, stop_words, workdir, args.seed, args.repeat, args.loop_cap)
+            report['results'][str(n)] = results
+            for stage in STAGES:
+                r = results[stage]
+                print(f"    {stage:<22} {r['us_per_msg']:>10,.1f} us/email {r['msg_per_s']:>12,.0f} email/s")
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[SUCCESS] Hasil ditulis ke {args.out}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"[WARNING] {regressions} tahap lebih lambat > {args.tolerance:.0%} dari baseline")
+            sys.exit(1)
+        print("[SUCCESS] Tidak ada regresi terhadap baseline.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Load generator untuk scoring_service.py: C koneksi keep-alive paralel
+mengirim N email sintetis ke POST /score, lalu melaporkan throughput,
+latency p50/p95/p99, dan jumlah request yang ditolak (503).
+
+    python scoring_service.py --port 8765 &
+    python benchmarks/load_generator.py --port 8765 -n 20000 -c 128
+    python benchmarks/load_generator.py --unix /tmp/threat.sock -n 20000 -c 128
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_bodies  # noqa: E402
+
+
+async def _request(reader, writer, body):
+    writer.write(b'POST /score HTTP/1.1\r\nHost: localhost\r\nContent-Type: text/plain\r\n'
+                 b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':')[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def _worker(open_connection, bodies, queue, latencies, statuses):
+    reader, writer = await open_connection()
+    try:
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            status = await _request(reader, writer, bodies[i])
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(args):
+    if args.unix:
+        open_connection = lambda: asyncio.open_unix_connection(args.unix)  # noqa: E731
+    else:
+        open_connection = lambda: asyncio.open_connection(args.host, args.port)  # noqa: E731
+
+    bodies = [b.encode() for b in make_bodies(args.n, seed=args.seed)]
+    queue = asyncio.Queue()
+    for i in range(args.n):
+        queue.put_nowait(i)
+
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(open_connection, bodies, queue, latencies, statuses)
+                           for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    lat = np.array(latencies) * 1e3
+    print(f"[RESULT] {args.n:,} request, {args.concurrency} koneksi, {elapsed:.2f}s "
+          f"-> {args.n / elapsed:,.0f} msg/s")
+    print(f"         latency p50 {np.percentile(lat, 50):.1f} ms | p95 {np.percentile(lat, 95):.1f} ms | "
+          f"p99 {np.percentile(lat, 99):.1f} ms")
+    print(f"         status: {dict(sorted(statuses.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None)
+    parser.add_argument('-n', type=int, default=10000, help='jumlah request')
+    parser.add_argument('-c', '--concurrency', type=int, default=64, help='jumlah koneksi paralel')
+    parser.add_argument('--seed', type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
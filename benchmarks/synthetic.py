@@ -0,0 +1,148 @@
+"""
+Generator korpus sintetis berbentuk email bisnis Enron untuk benchmark offline
+(tidak perlu mengunduh dataset Kaggle).
+
+`make_bodies` menghasilkan body saja; `make_emails` / `write_emails_csv`
+menghasilkan pesan RFC-822 lengkap (header Enron + body) dengan kolom
+`file, message` seperti `emails.csv`:
+
+    python benchmarks/synthetic.py emails_synthetic.csv -n 100000
+"""
+import argparse
+import random
+
+BUSINESS_WORDS = (
+    "meeting forecast project lunch report schedule review attached please call "
+    "gas power deal contract trading desk price curve position volume capacity "
+    "pipeline storage transport counterparty credit risk analyst team market "
+    "thanks regards tomorrow friday monday office conference agenda draft "
+    "comments changes spreadsheet model numbers budget presentation question "
+    "issue discuss follow information update california energy services group "
+    "the of and to in for is on that with this will be are from at as have we "
+    "you your our it not by an or if can would should could know need think"
+).split()
+
+# Kata "berisiko" yang disisipkan agar proporsi label warning mendekati notebook (~39%)
+RISK_WORDS = (
+    "urgent verify password bank transfer invoice money account suspended click "
+    "link warning legal action seizure kill destroy confidential secret fund alert"
+).split()
+
+
+def make_body(rng, risk_rate=0.08):
+    n_words = min(int(rng.lognormvariate(4.5, 1.0)) + 5, 3000)
+    words = [
+        rng.choice(RISK_WORDS) if rng.random() < risk_rate else rng.choice(BUSINESS_WORDS)
+        for _ in range(n_words)
+    ] if rng.random() < 0.4 else [rng.choice(BUSINESS_WORDS) for _ in range(n_words)]
+    lines = [' '.join(words[i:i + 12]) for i in range(0, len(words), 12)]
+    if rng.random() < 0.3:
+        lines[0] = lines[0].capitalize()
+    return '\n'.join(lines)
+
+
+def make_bodies(n, seed=42):
+    rng = random.Random(seed)
+    return [make_body(rng) for _ in range(n)]
+
+
+# -----------------------------------------------------------------------------
+# Pesan RFC-822 lengkap (bentuk emails.csv)
+# -----------------------------------------------------------------------------
+MAILBOXES = (
+    'allen-p', 'arnold-j', 'bass-e', 'beck-s', 'dasovich-j', 'germany-c', 'jones-t',
+    'kaminski-v', 'kean-s', 'lay-k', 'mann-k', 'shackleton-s', 'skilling-j', 'taylor-m',
+)
+FOLDERS = ('_sent_mail', 'inbox', 'all_documents', 'discussion_threads', 'notes_inbox', 'deleted_items')
+# Pengirim eksternal (domain tersangka untuk simulasi SOAR) dan webmail
+EXTERNAL_DOMAINS = (
+    'aol.com', 'hotmail.com', 'yahoo.com', 'energy-news.com', 'calpine.com',
+    'secure-account-verify.net', 'invoice-center.biz', 'wire-transfer-alert.com',
+)
+SUBJECTS = (
+    'Re: meeting tomorrow', 'FW: gas forecast', 'Position report', 'Re: contract review',
+    'Deal confirmation', 'Agenda for friday', 'RE: California update', '',
+)
+RISK_SUBJECTS = ('URGENT: verify your account', 'Invoice overdue', 'Action required: password reset')
+_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def _address(rng, mailbox=None):
+    if mailbox is None and rng.random() < 0.25:
+        return f"{rng.choice(('info', 'support', 'john.doe', 'billing', 'news'))}@{rng.choice(EXTERNAL_DOMAINS)}"
+    last, first = (mailbox or rng.choice(MAILBOXES)).split('-')
+    return f"{first}.{last}@enron.com"
+
+
+def _date(rng):
+    # Rentang korpus Enron (1999-2002), termasuk akhir pekan dan jam malam
+    year, month, day = rng.randint(1999, 2002), rng.randint(1, 12), rng.randint(1, 28)
+    hour, minute = rng.randint(0, 23), rng.randint(0, 59)
+    weekday = _WEEKDAYS[(day + 2 * month + year) % 7]
+    zone = rng.choice(('-0700 (PDT)', '-0800 (PST)', '-0500 (CDT)'))
+    return f"{weekday}, {day} {_MONTHS[month - 1]} {year} {hour:02d}:{minute:02d}:00 {zone}"
+
+
+def make_message(rng, i, mailbox=None):
+    """Satu email mentah dengan header Enron (Message-ID, Date, From, To, X-*) dan body."""
+    mailbox = mailbox or rng.choice(MAILBOXES)
+    sender, recipient = _address(rng), _address(rng, rng.choice(MAILBOXES))
+    body = make_body(rng)
+    if rng.random() < 0.2:
+        # Forward/reply: alamat pengirim asli muncul di body (dibaca extract_domain)
+        body = f"-----Original Message-----\nFrom: {sender}\nSent: {_date(rng)}\n\n{body}"
+    date = _date(rng) if rng.random() > 0.002 else 'not a date'
+    headers = [
+        f"Message-ID: <{10000000 + i}.{1075840000000 + i}.JavaMail.evans@thyme>",
+        f"Date: {date}",
+        f"From: {sender}",
+        f"To: {recipient}",
+        f"Subject: {rng.choice(RISK_SUBJECTS if rng.random() < 0.03 else SUBJECTS)}",
+        "Mime-Version: 1.0",
+        "Content-Type: text/plain; charset=us-ascii",
+        "Content-Transfer-Encoding: 7bit",
+        f"X-From: {sender.split('@')[0]}",
+        f"X-To: {recipient.split('@')[0]}",
+        "X-cc: ",
+        "X-bcc: ",
+        f"X-Folder: \\{mailbox}\\Notes Folders\\Inbox",
+        f"X-Origin: {mailbox.title()}",
+        f"X-FileName: {mailbox.split('-')[0]} (Non-Privileged).pst",
+    ]
+    return '\n'.join(headers) + '\n\n' + body
+
+
+def make_emails(n, seed=42):
+    """DataFrame kolom `file, message` seperti emails.csv (deterministik untuk seed yang sama)."""
+    import pandas as pd
+
+    rng = random.Random(seed)
+    files, messages = [], []
+    for i in range(n):
+        mailbox = rng.choice(MAILBOXES)
+        files.append(f"{mailbox}/{rng.choice(FOLDERS)}/{i + 1}.")
+        messages.append(make_message(rng, i, mailbox))
+    return pd.DataFrame({'file': files, 'message': messages})
+
+
+def write_emails_csv(path, n, seed=42, chunk=50000):
+    """Tulis emails.csv sintetis per chunk (RAM tetap kecil untuk n besar). Return path."""
+    for start in range(0, n, chunk):
+        df = make_emails(min(chunk, n - start), seed + start)
+        df.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('out', help='path CSV keluaran')
+    parser.add_argument('-n', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    write_emails_csv(args.out, args.n, args.seed)
+    print(f"[SUCCESS] {args.n:,} email sintetis ditulis ke {args.out}")
+
+
+if __name__ == '__main__':
+    main()
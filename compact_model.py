@@ -0,0 +1,396 @@
+"""
+Ekspor model inferensi ringkas: vocabulary TF-IDF dipangkas ke fitur yang
+benar-benar dipakai split XGBoost (dan IsolationForest bila ada), lalu indeks
+fitur di setiap pohon di-remap ke kolom baru.
+
+Norm L2 TF-IDF tetap dihitung dari seluruh vocabulary (5000 term), jadi nilai
+setiap kolom yang tersisa sama persis dengan TfidfVectorizer asli dan skor
+model identik. Yang berkurang adalah lebar/nnz matriks fitur yang dibangun
+dan dikirim ke model.
+
+Mode `--hashing` menggantikan dict vocabulary dengan HashingVectorizer: term
+vocabulary dipetakan ke bucket hash (ukuran dipilih tanpa tabrakan antar term
+vocabulary), sehingga tidak ada dict string sama sekali. Token di luar
+vocabulary yang kebetulan jatuh di bucket yang sama ikut terhitung, jadi skor
+hanya mendekati; selisihnya dilaporkan saat ekspor.
+
+    python compact_model.py                      # -> artifacts_compact/
+    python compact_model.py --hashing --out compact_hashed
+    THREAT_ENGINE_ARTIFACTS=artifacts_compact streamlit run app_uas_final.py
+"""
+import argparse
+import json
+import os
+import pickle
+import re
+import shutil
+import time
+from collections import Counter
+
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+
+from model_registry import ARTIFACT_FILES, ModelRegistry, write_manifest
+
+COMPACT_DIR = 'artifacts_compact'
+
+# Rentang ukuran tabel hash (2^k bucket) untuk mode --hashing
+_MIN_HASH_BITS = 18
+_MAX_HASH_BITS = 28
+
+
+class _CompactTfidf:
+    """
+    Dasar vectorizer ringkas: `_counts` menghasilkan matriks hitungan term
+    (N x V, urutan term asli), lalu `transform` menerapkan sublinear tf, idf,
+    norm (atas seluruh V term), dan memilih kolom yang dipakai model.
+    """
+
+    def __init__(self, idf, columns, norm='l2', sublinear_tf=False, binary=False,
+                 lowercase=True, token_pattern=r'(?u)\b\w\w+\b'):
+        self.idf_ = np.asarray(idf, dtype=np.float64)
+        # columns_[j] = kolom output untuk term j, atau -1 bila term dibuang
+        self.columns_ = np.asarray(columns, dtype=np.int32)
+        self.n_features_out = int((self.columns_ >= 0).sum())
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._token_re = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop('_token_re', None)
+        return state
+
+    def _tokens(self, doc):
+        if getattr(self, '_token_re', None) is None:
+            self._token_re = re.compile(self.token_pattern)
+        return self._token_re.findall(doc.lower() if self.lowercase else doc)
+
+    def transform(self, docs):
+        X = self._counts(docs)
+        if self.binary:
+            X.data.fill(1)
+        # Urutan operasi sama dengan TfidfTransformer.transform
+        if self.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        X.data *= self.idf_[X.indices]
+        if self.norm is not None:
+            X = normalize(X, norm=self.norm, copy=False)
+
+        # Pilih kolom terpakai; urutan indeks per baris tetap terurut
+        cols = self.columns_[X.indices]
+        keep = cols >= 0
+        kept = np.concatenate([[0], np.cumsum(keep)])
+        return csr_matrix((X.data[keep], cols[keep], kept[X.indptr]),
+                          shape=(X.shape[0], self.n_features_out), copy=False)
+
+
+class PrunedTfidfVectorizer(_CompactTfidf):
+    """Vocabulary lengkap hanya untuk hitungan + norm; output berisi kolom terpakai saja. Skor identik."""
+
+    def __init__(self, vocabulary, idf, columns, **params):
+        super().__init__(idf, columns, **params)
+        self.vocabulary_ = dict(vocabulary)
+
+    def _counts(self, docs):
+        lookup = self.vocabulary_.get
+        indptr, indices, values = [0], [], []
+        for doc in docs:
+            for token, count in Counter(self._tokens(doc)).items():
+                j = lookup(token)
+                if j is not None:
+                    indices.append(j)
+                    values.append(count)
+            indptr.append(len(indices))
+        X = csr_matrix((np.asarray(values, dtype=np.float64), np.asarray(indices, dtype=np.int32),
+                        np.asarray(indptr, dtype=np.int64)), shape=(len(indptr) - 1, len(self.idf_)))
+        X.sort_indices()
+        return X
+
+
+class HashedTfidfVectorizer(_CompactTfidf):
+    """Tanpa dict vocabulary: term dikenali dari bucket HashingVectorizer. Skor mendekati."""
+
+    def __init__(self, hash_bits, buckets, idf, columns, **params):
+        # Disimpan terurut menurut bucket agar bisa dicari dengan searchsorted
+        order = np.argsort(buckets)
+        super().__init__(np.asarray(idf)[order], np.asarray(columns)[order], **params)
+        self.hash_bits = hash_bits
+        self.buckets_ = np.asarray(buckets, dtype=np.int64)[order]
+
+    def _hasher(self):
+        from sklearn.feature_extraction.text import HashingVectorizer
+        return HashingVectorizer(n_features=2 ** self.hash_bits, alternate_sign=False, norm=None,
+                                 lowercase=self.lowercase, token_pattern=self.token_pattern)
+
+    def _counts(self, docs):
+        H = self._hasher().transform(docs)
+        H.sort_indices()
+        pos = np.minimum(np.searchsorted(self.buckets_, H.indices), len(self.buckets_) - 1)
+        hit = self.buckets_[pos] == H.indices
+        kept = np.concatenate([[0], np.cumsum(hit)])
+        return csr_matrix((H.data[hit], pos[hit].astype(np.int32), kept[H.indptr]),
+                          shape=(H.shape[0], len(self.idf_)), copy=False)
+
+
+def _tfidf_params(vectorizer):
+    unsupported = {
+        'analyzer': 'word', 'ngram_range': (1, 1), 'tokenizer': None, 'preprocessor': None,
+        'strip_accents': None, 'use_idf': True,
+    }
+    for name, expected in unsupported.items():
+        if getattr(vectorizer, name) != expected:
+            raise ValueError(f"TfidfVectorizer dengan {name}={getattr(vectorizer, name)!r} belum didukung")
+    return {
+        'norm': vectorizer.norm, 'sublinear_tf': vectorizer.sublinear_tf, 'binary': vectorizer.binary,
+        'lowercase': vectorizer.lowercase, 'token_pattern': vectorizer.token_pattern,
+    }
+
+
+def _hash_buckets(terms, params):
+    """Bucket setiap term untuk 2^k terkecil tanpa tabrakan antar term vocabulary."""
+    from sklearn.feature_extraction.text import HashingVectorizer
+    for bits in range(_MIN_HASH_BITS, _MAX_HASH_BITS + 1):
+        hasher = HashingVectorizer(n_features=2 ** bits, alternate_sign=False, norm=None,
+                                   lowercase=params['lowercase'], token_pattern=params['token_pattern'])
+        H = hasher.transform(terms)
+        if (np.diff(H.indptr) != 1).any():
+            raise ValueError("Term vocabulary tidak menghasilkan tepat satu token")
+        if len(np.unique(H.indices)) == len(terms):
+            return bits, H.indices.astype(np.int64)
+    raise ValueError(f"Tabrakan hash antar term vocabulary bahkan pada 2^{_MAX_HASH_BITS} bucket")
+
+
+# ---------------------------------------------------------------------------
+# Fitur terpakai dan remap model
+# ---------------------------------------------------------------------------
+def xgb_used_features(xgb):
+    model = json.loads(xgb.get_booster().save_raw('json'))
+    used = set()
+    for tree in model['learner']['gradient_booster']['model']['trees']:
+        left = np.asarray(tree['left_children'])
+        used.update(np.asarray(tree['split_indices'])[left != -1].tolist())
+    return used
+
+
+def iso_used_features(iso):
+    if hasattr(iso, 'used_features'):
+        # ProjectedIsolationForest (anomaly.py): kolom dengan bobot proyeksi tidak nol
+        return iso.used_features()
+    used = set()
+    for est, features in zip(iso.estimators_, iso.estimators_features_):
+        tree = est.tree_
+        internal = tree.children_left != -1
+        used.update(np.asarray(features)[tree.feature[internal]].tolist())
+    return used
+
+
+def remap_xgb(xgb, mapping, n_features):
+    """XGBClassifier baru dengan split_indices lama -> mapping[lama]."""
+    from xgboost import XGBClassifier
+    model = json.loads(xgb.get_booster().save_raw('json'))
+    learner = model['learner']
+    for tree in learner['gradient_booster']['model']['trees']:
+        left = np.asarray(tree['left_children'])
+        split = np.asarray(tree['split_indices'])
+        split[left != -1] = mapping[split[left != -1]]
+        split[left == -1] = 0
+        tree['split_indices'] = split.tolist()
+        tree['tree_param']['num_feature'] = str(n_features)
+    learner['learner_model_param']['num_feature'] = str(n_features)
+    for key in ('feature_names', 'feature_types'):
+        if learner.get(key):
+            values = [None] * n_features
+            for old, new in enumerate(mapping):
+                if new >= 0:
+                    values[new] = learner[key][old]
+            learner[key] = values
+
+    compact = XGBClassifier()
+    compact.load_model(bytearray(json.dumps(model).encode()))
+    return compact
+
+
+def remap_iso(iso, mapping, n_features):
+    """Salinan IsolationForest dengan indeks fitur setiap pohon di-remap ke kolom ringkas."""
+    import copy
+
+    from sklearn.tree._tree import Tree
+
+    if hasattr(iso, 'remapped'):
+        return iso.remapped(mapping, n_features)
+    compact = copy.deepcopy(iso)
+    for est, features in zip(compact.estimators_, compact.estimators_features_):
+        state = est.tree_.__getstate__()
+        nodes = state['nodes'].copy()
+        internal = nodes['left_child'] != -1
+        nodes['feature'][internal] = mapping[np.asarray(features)[nodes['feature'][internal]]]
+        state['nodes'] = nodes
+        tree = Tree(n_features, np.asarray(est.tree_.n_classes), est.tree_.n_outputs)
+        tree.__setstate__(state)
+        est.tree_ = tree
+        est.n_features_in_ = n_features
+        est.max_features_ = n_features
+    compact.estimators_features_ = [np.arange(n_features) for _ in compact.estimators_]
+    compact._max_features = n_features
+    compact.n_features_in_ = n_features
+    return compact
+
+
+def build_compact(registry, hashing=False):
+    """(vectorizer, xgb, iso, info) ringkas dari artefak di `registry`."""
+    vectorizer = registry.get('vectorizer')
+    xgb = registry.get('xgb')
+    iso = registry.get('iso')
+    n_text = len(vectorizer.vocabulary_)
+    n_total = xgb.n_features_in_
+
+    used = xgb_used_features(xgb) | (iso_used_features(iso) if iso is not None else set())
+    keep_text = np.array(sorted(j for j in used if j < n_text), dtype=np.int64)
+
+    # Kolom lama -> kolom baru; metadata (setelah TF-IDF) selalu dipertahankan
+    mapping = np.full(n_total, -1, dtype=np.int64)
+    mapping[keep_text] = np.arange(len(keep_text))
+    mapping[n_text:] = len(keep_text) + np.arange(n_total - n_text)
+    n_compact = len(keep_text) + n_total - n_text
+
+    params = _tfidf_params(vectorizer)
+    columns = mapping[:n_text]
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    if hashing:
+        bits, buckets = _hash_buckets(terms, params)
+        compact_vec = HashedTfidfVectorizer(bits, buckets, vectorizer.idf_, columns, **params)
+    else:
+        compact_vec = PrunedTfidfVectorizer(vectorizer.vocabulary_, vectorizer.idf_, columns, **params)
+
+    info = {
+        'mode': 'hashing' if hashing else 'pruned',
+        'text_features': int(n_text),
+        'text_features_kept': int(len(keep_text)),
+        'xgb_features_used': len(xgb_used_features(xgb)),
+        'iso_features_used': len(iso_used_features(iso)) if iso is not None else None,
+    }
+    if hashing:
+        info['hash_bits'] = bits
+    return (compact_vec, remap_xgb(xgb, mapping, n_compact),
+            remap_iso(iso, mapping, n_compact) if iso is not None else None, info)
+
+
+def export_compact(out_dir=COMPACT_DIR, registry=None, hashing=False):
+    """Tulis artefak ringkas (nama file sama dengan Cell 11) + manifest ke `out_dir`."""
+    registry = registry or ModelRegistry()
+    registry.validate()
+    vectorizer, xgb, iso, info = build_compact(registry, hashing)
+
+    os.makedirs(out_dir, exist_ok=True)
+    joblib.dump(vectorizer, os.path.join(out_dir, ARTIFACT_FILES['vectorizer']))
+    joblib.dump(xgb, os.path.join(out_dir, ARTIFACT_FILES['xgb']))
+    if iso is not None:
+        joblib.dump(iso, os.path.join(out_dir, ARTIFACT_FILES['iso']))
+    shutil.copy2(registry.path('scaler'), os.path.join(out_dir, ARTIFACT_FILES['scaler']))
+    # Tanpa hashing skor identik dengan model asli, sehingga metrik data ujinya tetap berlaku
+    training = None if hashing else (registry.manifest() or {}).get('training')
+    write_manifest(out_dir, n_text_features=vectorizer.n_features_out, compact=info,
+                   **({'training': training} if training else {}))
+    return info
+
+
+# ---------------------------------------------------------------------------
+# Laporan penghematan
+# ---------------------------------------------------------------------------
+def _load_seconds(path, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        joblib.load(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _object_bytes(obj):
+    """Perkiraan memori objek: ukuran pickle di memori."""
+    return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _throughput(fn, texts, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(texts)
+        best = min(best, time.perf_counter() - start)
+    return len(texts) / best
+
+
+def compare(full_dir, compact_dir, texts, threshold=60):
+    """Bandingkan skor, memori, waktu muat, dan throughput dua direktori artefak."""
+    from threat_engine import PremiumThreatEngine
+
+    rows = {}
+    scores = {}
+    for label, path in (('full', full_dir), ('compact', compact_dir)):
+        registry = ModelRegistry(path)
+        engine = PremiumThreatEngine(registry=registry, cache_size=0, blocklist=False)
+        bodies, meta = engine.pipeline.parse(texts)
+        scores[label] = engine.score_many(bodies, meta)[0]
+        X = engine.pipeline.transform(bodies, meta)
+        rows[label] = {
+            'vectorizer_bytes': _object_bytes(engine.vectorizer),
+            'xgb_bytes': _object_bytes(engine.xgb),
+            'vectorizer_load_ms': _load_seconds(registry.path('vectorizer')) * 1e3,
+            'xgb_load_ms': _load_seconds(registry.path('xgb')) * 1e3,
+            'n_features': X.shape[1],
+            'nnz_per_msg': X.nnz / max(len(texts), 1),
+            'transform_msg_per_s': _throughput(lambda t: engine.pipeline.transform(t, meta), bodies),
+            'score_msg_per_s': _throughput(lambda t: engine.score_many(t, meta), bodies),
+        }
+
+    diff = np.abs(scores['full'] - scores['compact'])
+    verdict_flips = int(((scores['full'] * 100 > threshold) != (scores['compact'] * 100 > threshold)).sum())
+    return rows, {'identical': bool(np.array_equal(scores['full'], scores['compact'])),
+                  'max_abs_diff': float(diff.max()) if len(diff) else 0.0,
+                  'verdict_flips': verdict_flips, 'n': len(texts)}
+
+
+def _print_report(rows, agreement):
+    full, compact = rows['full'], rows['compact']
+    print(f"\n{'metric':<22} | {'full':>12} | {'compact':>12} | {'ratio':>7}")
+    print('-' * 62)
+    for key in full:
+        ratio = compact[key] / full[key] if full[key] else float('nan')
+        print(f"{key:<22} | {full[key]:>12,.2f} | {compact[key]:>12,.2f} | {ratio:>6.2f}x")
+    status = 'IDENTIK' if agreement['identical'] else f"max |diff| {agreement['max_abs_diff']:.2e}"
+    print(f"\n[INFO] Skor {agreement['n']:,} email: {status}, verdict berubah: {agreement['verdict_flips']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default=COMPACT_DIR)
+    parser.add_argument('--hashing', action='store_true', help='HashingVectorizer tanpa dict vocabulary (skor mendekati)')
+    parser.add_argument('--sample', type=int, default=5000, help='jumlah email sintetis untuk verifikasi & laporan')
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    info = export_compact(args.out, registry, args.hashing)
+    print(f"[SUCCESS] Artefak ringkas ({info['mode']}) ditulis ke {args.out}/: "
+          f"{info['text_features_kept']:,} dari {info['text_features']:,} fitur TF-IDF dipakai model")
+
+    from benchmarks.synthetic import make_bodies
+    rows, agreement = compare(registry.artifact_dir, args.out, make_bodies(args.sample))
+    _print_report(rows, agreement)
+    if not args.hashing and not agreement['identical']:
+        raise SystemExit("[WARNING] Skor model ringkas tidak identik dengan model asli")
+
+
+if __name__ == '__main__':
+    # Impor lewat nama modul agar class vectorizer di-pickle sebagai compact_model.*, bukan __main__.*
+    from compact_model import main as _main
+    _main()
@@ -0,0 +1,226 @@
+"""
+Cache korpus hasil preprocessing berbasis hash konten (menggantikan
+`cleaned_enron_data.csv`).
+
+Setiap email mentah diberi kunci hash (BLAKE2b dari kolom 'message'), lalu
+hasil parsing, label, metadata, dan clean_text disimpan sekali saja ke
+Parquet. Menjalankan ulang notebook hanya memproses email yang hashnya belum
+ada di cache (email baru atau berubah); sisanya dibaca langsung dari Parquet
+(memory-mapped). Baris TF-IDF disimpan per segmen sebagai CSR `.npz` dengan
+kunci fingerprint vectorizer, sehingga training ulang dengan vectorizer yang
+sama tidak perlu transform ulang.
+
+    corpus_cache/
+      manifest.json                         fingerprint fitur (stopwords + keywords)
+      segments/000001.parquet               satu segmen per proses update
+      tfidf/<fingerprint>/000001.npz         baris TF-IDF per segmen
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from email_ingest import DEFAULT_CHUNKSIZE, iter_message_chunks, ordered_map, parse_messages
+from features import LABEL_COLUMNS, META_COLUMNS, clean_text, metadata_features, warning_labels
+from keywords import KEYWORDS
+
+CACHE_DIR = 'corpus_cache'
+CACHE_VERSION = 2  # 2: kolom sender (header From)
+MANIFEST_FILE = 'manifest.json'
+
+CORPUS_COLUMNS = ['hash', 'subject', 'date', 'body', 'sender'] + LABEL_COLUMNS + META_COLUMNS + ['clean_text']
+
+
+def message_hash(message):
+    return hashlib.blake2b(message.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+
+def feature_fingerprint(stop_words):
+    """Hash dari semua parameter yang mempengaruhi isi cache."""
+    spec = {'version': CACHE_VERSION, 'stop_words': sorted(stop_words), 'keywords': KEYWORDS}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def vectorizer_fingerprint(vectorizer):
+    import joblib
+    return joblib.hash(vectorizer)[:16]
+
+
+def build_segment(hashes, messages, stop_words):
+    """Parse + label + metadata + clean_text untuk email baru (dijalankan di worker process)."""
+    df = parse_messages(messages)
+    df.insert(0, 'hash', hashes)
+    df[LABEL_COLUMNS] = warning_labels(df)
+
+    df['date'] = pd.to_datetime(df['date'], errors='coerce', utc=True)
+    meta = metadata_features(df)
+    # Tanggal tidak valid tetap disimpan (agar tidak diproses ulang), hour = -1;
+    # notebook membuang baris ini lewat dropna(subset=['date'])
+    meta['hour'] = meta['hour'].fillna(-1).astype('int32')
+    df[META_COLUMNS] = meta
+
+    df['clean_text'] = clean_text(df['body'], stop_words)
+    return df[CORPUS_COLUMNS]
+
+
+class CorpusCache:
+    def __init__(self, root=CACHE_DIR, stop_words=frozenset()):
+        self.root = root
+        self.stop_words = frozenset(stop_words)
+        self.fingerprint = feature_fingerprint(self.stop_words)
+        self._check_manifest()
+
+    def _path(self, *parts):
+        return os.path.join(self.root, *parts)
+
+    def _check_manifest(self):
+        manifest_path = self._path(MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                if json.load(f).get('features') == self.fingerprint:
+                    return
+            # Stopwords/keywords berubah: isi cache lama tidak lagi valid
+            print("[INFO] Fingerprint fitur berubah, cache korpus dibangun ulang.")
+            self.clear()
+
+        os.makedirs(self._path('segments'), exist_ok=True)
+        with open(manifest_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'features': self.fingerprint}, f, indent=2)
+
+    def clear(self):
+        for name in ('segments', 'tfidf'):
+            shutil.rmtree(self._path(name), ignore_errors=True)
+        if os.path.exists(self._path(MANIFEST_FILE)):
+            os.remove(self._path(MANIFEST_FILE))
+
+    def segments(self):
+        folder = self._path('segments')
+        if not os.path.isdir(folder):
+            return []
+        return sorted(os.path.join(folder, n) for n in os.listdir(folder) if n.endswith('.parquet'))
+
+    def _read(self, columns=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tables = [pq.read_table(p, columns=columns, memory_map=True) for p in self.segments()]
+        if not tables:
+            return pd.DataFrame(columns=columns or CORPUS_COLUMNS)
+        return pa.concat_tables(tables).to_pandas()
+
+    def hash_index(self):
+        """pd.Index berisi semua hash di cache, urut sesuai segmen (= urutan baris TF-IDF)."""
+        return pd.Index(self._read(['hash'])['hash'])
+
+    def update(self, csv_path, chunksize=DEFAULT_CHUNKSIZE, workers=None, nrows=None):
+        """
+        Sinkronkan cache dengan `emails.csv`: hanya email yang belum ada di cache
+        yang diparsing (paralel). Return (hashes urut sesuai file, stats).
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        start = time.perf_counter()
+        known = set(self.hash_index())
+        order = []
+
+        def new_messages():
+            for messages in iter_message_chunks(csv_path, chunksize, nrows):
+                hashes = [message_hash(m) for m in messages]
+                order.extend(hashes)
+                new_hashes, new_msgs = [], []
+                for h, m in zip(hashes, messages):
+                    if h not in known:
+                        known.add(h)
+                        new_hashes.append(h)
+                        new_msgs.append(m)
+                if new_hashes:
+                    yield new_hashes, new_msgs, self.stop_words
+
+        seg_path = self._path('segments', f'{len(self.segments()) + 1:06d}.parquet')
+        tmp_path = seg_path + '.tmp'
+        writer = None
+        added = 0
+        try:
+            for df in ordered_map(build_segment, new_messages(), workers):
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+                added += len(df)
+        finally:
+            if writer is not None:
+                writer.close()
+        # Segmen baru baru terlihat setelah seluruh update selesai
+        if writer is not None:
+            os.replace(tmp_path, seg_path)
+
+        elapsed = time.perf_counter() - start
+        return order, {'rows': len(order), 'new': added, 'cached': len(order) - added, 'elapsed': elapsed}
+
+    def load(self, hashes=None, columns=None):
+        """DataFrame korpus untuk `hashes` (urutan & duplikat dipertahankan), atau seluruh cache."""
+        if columns is not None and 'hash' not in columns:
+            columns = ['hash'] + list(columns)
+        df = self._read(columns)
+        if hashes is None:
+            return df
+        return df.take(self._positions(df['hash'], hashes)).reset_index(drop=True)
+
+    def _positions(self, index, hashes):
+        pos = pd.Index(index).get_indexer(hashes)
+        if (pos < 0).any():
+            raise KeyError(f"{int((pos < 0).sum())} hash tidak ada di cache, jalankan update() terlebih dahulu")
+        return pos
+
+    def _segment_tfidf(self, folder, seg, vectorizer):
+        """TF-IDF satu segmen: dari `.npz`, atau transform sekali lalu disimpan."""
+        from scipy.sparse import load_npz, save_npz
+
+        npz_path = os.path.join(folder, os.path.basename(seg).replace('.parquet', '.npz'))
+        if os.path.exists(npz_path):
+            return load_npz(npz_path).tocsr()
+        import pyarrow.parquet as pq
+        text = pq.read_table(seg, columns=['clean_text'], memory_map=True).column('clean_text').to_pylist()
+        X = vectorizer.transform(text).tocsr()
+        save_npz(npz_path, X, compressed=False)
+        return X
+
+    def tfidf(self, vectorizer, hashes):
+        """
+        Matriks TF-IDF (CSR) untuk `hashes`. Hanya segmen yang memuat hash yang
+        diminta yang dibaca, satu per satu; segmen yang belum punya `.npz` untuk
+        fingerprint vectorizer ini di-transform sekali lalu disimpan.
+        """
+        import pyarrow.parquet as pq
+        from scipy.sparse import csr_matrix, vstack
+
+        from model_registry import vectorizer_width
+
+        pos = self._positions(self.hash_index(), list(hashes))
+        if len(pos) == 0:
+            return csr_matrix((0, vectorizer_width(vectorizer)))
+
+        folder = self._path('tfidf', vectorizer_fingerprint(vectorizer))
+        os.makedirs(folder, exist_ok=True)
+        segments = self.segments()
+        bounds = np.cumsum([0] + [pq.ParquetFile(seg).metadata.num_rows for seg in segments])
+        seg_of = np.searchsorted(bounds, pos, side='right') - 1
+
+        parts, order = [], []
+        for k in np.unique(seg_of):
+            rows = np.flatnonzero(seg_of == k)
+            parts.append(self._segment_tfidf(folder, segments[k], vectorizer)[pos[rows] - bounds[k]])
+            order.append(rows)
+        X = vstack(parts, format='csr')
+        # Kembalikan ke urutan `hashes`
+        return X[np.argsort(np.concatenate(order))]
+
+    def status(self):
+        segments = self.segments()
+        size = sum(os.path.getsize(p) for p in segments)
+        return {'segments': len(segments), 'rows': len(self.hash_index()), 'parquet_mb': size / 1e6}
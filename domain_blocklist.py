@@ -0,0 +1,251 @@
+"""
+Blocklist domain persisten (SQLite) untuk jalur cepat sebelum scoring ML.
+
+Domain pengirim (header From, `soar.sender_domain`) dari email yang mendapat
+aksi BLOCK dari kebijakan mitigasi (notebook Cell 10, Bulk Analysis) ditulis
+ke tabel `blocked_domains`. Engine memeriksa domain pengirim sebelum
+vectorize/XGBoost: email dari domain yang sudah diblokir langsung diberi skor
+maksimum tanpa inferensi model. Alamat yang hanya disebut di body tidak
+pernah dicocokkan, dan email tanpa header From tidak mendapat verdict
+blocklist.
+
+Di depan SQLite ada Bloom filter di memori, sehingga domain yang tidak
+diblokir (kasus paling umum) ditolak tanpa query ke database. Database
+dibuka dalam mode WAL agar app Streamlit, Bulk Analysis, dan scoring
+service bisa membaca/menulis file yang sama; perubahan dari proses lain
+terdeteksi lewat `PRAGMA data_version` dan Bloom filter dibangun ulang.
+"""
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+
+# Set THREAT_ENGINE_BLOCKLIST=<path> untuk memakai file blocklist lain
+BLOCKLIST_PATH_ENV = 'THREAT_ENGINE_BLOCKLIST'
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'domain_blocklist.db')
+
+# Domain yang tidak pernah diblokir: alamat internal @enron.com muncul di hampir
+# setiap body (forward/reply), dan penyedia webmail dipakai bersama oleh jutaan
+# pengirim yang tidak berhubungan
+PROTECTED_DOMAINS = ('enron.com', 'aol.com', 'hotmail.com', 'yahoo.com', 'gmail.com', 'msn.com')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocked_domains (
+    domain     TEXT PRIMARY KEY,
+    source     TEXT,
+    risk_score REAL,
+    hits       INTEGER NOT NULL DEFAULT 0,
+    added_at   REAL NOT NULL,
+    last_hit   REAL
+) WITHOUT ROWID
+"""
+
+_SQL_CHUNK = 500  # batas parameter per query IN (...)
+HIT_FLUSH_SECONDS = 1.0  # hit counter ditulis ke SQLite paling sering sekali per detik
+
+
+def default_path():
+    return os.environ.get(BLOCKLIST_PATH_ENV) or DEFAULT_PATH
+
+
+class BloomFilter:
+    """Bloom filter sederhana (bytearray + double hashing blake2b)."""
+
+    def __init__(self, capacity=1024, error_rate=0.001):
+        self.capacity = max(int(capacity), 1)
+        # m = -n ln p / (ln 2)^2, k = m/n ln 2
+        self.n_bits = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 64)
+        self.n_hashes = max(int(round(self.n_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.n_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.n_bits for i in range(self.n_hashes)]
+
+    def add(self, item):
+        for p in self._positions(item):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+def is_protected(domain, protected=PROTECTED_DOMAINS):
+    return any(domain == p or domain.endswith('.' + p) for p in protected)
+
+
+class DomainBlocklist:
+    def __init__(self, path=None, bloom=True, protected=PROTECTED_DOMAINS):
+        self.path = path or default_path()
+        self.protected = tuple(protected)
+        self.use_bloom = bloom
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # WAL + synchronous=NORMAL: commit tidak menunggu fsync
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(_SCHEMA)
+
+        self.lookups = 0
+        self.bloom_rejects = 0
+        self.db_queries = 0
+        self.hits = 0
+        self._pending_hits = {}
+        self._last_flush = time.monotonic()
+        self._rebuild()
+
+    def _data_version(self):
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _rebuild(self):
+        """Bangun ulang Bloom filter dari isi tabel (dipanggil dengan lock atau saat init)."""
+        self._version = self._data_version()
+        # Domain yang sudah terkonfirmasi ada di tabel (hit berulang tanpa query)
+        self._confirmed = set()
+        if not self.use_bloom:
+            self._bloom = None
+            return
+        domains = [d for (d,) in self._conn.execute('SELECT domain FROM blocked_domains')]
+        self._bloom = BloomFilter(capacity=max(2 * len(domains), 1024))
+        for d in domains:
+            self._bloom.add(d)
+
+    def _refresh(self):
+        # Proses lain (app / bulk / service) menulis ke file yang sama
+        if self._data_version() != self._version:
+            self._rebuild()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM blocked_domains').fetchone()[0]
+
+    def __contains__(self, domain):
+        """Cek satu domain tanpa mengubah statistik hit."""
+        if not domain:
+            return False
+        with self._lock:
+            self._refresh()
+            if domain in self._confirmed:
+                return True
+            if self._bloom is not None and domain not in self._bloom:
+                return False
+            return self._conn.execute('SELECT 1 FROM blocked_domains WHERE domain = ?', (domain,)).fetchone() is not None
+
+    def add_many(self, domains, source='soar', risk_score=None):
+        """Tambahkan domain (aksi BLOCK). Domain internal dilewati. Return jumlah domain baru."""
+        now = time.time()
+        rows = sorted({d.lower() for d in domains if isinstance(d, str) and d and not is_protected(d.lower(), self.protected)})
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute('BEGIN')
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO blocked_domains (domain, source, risk_score, added_at) VALUES (?, ?, ?, ?)',
+                [(d, source, risk_score, now) for d in rows])
+            self._conn.execute('COMMIT')
+            added = self._conn.total_changes - before
+            if self._bloom is not None:
+                if self._bloom.count + added > self._bloom.capacity:
+                    self._rebuild()
+                else:
+                    for d in rows:
+                        self._bloom.add(d)
+        return added
+
+    def add(self, domain, source='manual', risk_score=None):
+        return self.add_many([domain], source, risk_score) == 1
+
+    def remove(self, domain):
+        with self._lock:
+            self._conn.execute('DELETE FROM blocked_domains WHERE domain = ?', (domain.lower(),))
+            # Bloom filter tidak bisa menghapus elemen
+            self._rebuild()
+
+    def match_many(self, domains):
+        """
+        List bool: apakah domain ke-i ada di blocklist. `None`/kosong = tidak.
+        Mencatat statistik lookup dan menambah hit counter domain yang cocok.
+        """
+        domains = list(domains)
+        with self._lock:
+            self._refresh()
+            confirmed = self._confirmed
+            candidates = set()
+            for d in domains:
+                if not d:
+                    continue
+                self.lookups += 1
+                if d in confirmed:
+                    continue
+                if self._bloom is not None and d not in self._bloom:
+                    self.bloom_rejects += 1
+                else:
+                    candidates.add(d)
+
+            blocked = set()
+            if candidates:
+                candidates = sorted(candidates)
+                for i in range(0, len(candidates), _SQL_CHUNK):
+                    part = candidates[i:i + _SQL_CHUNK]
+                    self.db_queries += 1
+                    blocked.update(d for (d,) in self._conn.execute(
+                        f'SELECT domain FROM blocked_domains WHERE domain IN ({",".join("?" * len(part))})', part))
+                confirmed |= blocked
+
+            result = [bool(d) and d in confirmed for d in domains]
+            pending = self._pending_hits
+            for d, hit in zip(domains, result):
+                if hit:
+                    pending[d] = pending.get(d, 0) + 1
+                    self.hits += 1
+            if pending and time.monotonic() - self._last_flush >= HIT_FLUSH_SECONDS:
+                self._flush_hits()
+            return result
+
+    def _flush_hits(self):
+        """Tulis hit counter yang tertunda (dipanggil dengan lock)."""
+        self._last_flush = time.monotonic()
+        if not self._pending_hits:
+            return
+        now = time.time()
+        self._conn.execute('BEGIN')
+        self._conn.executemany('UPDATE blocked_domains SET hits = hits + ?, last_hit = ? WHERE domain = ?',
+                               [(n, now, d) for d, n in self._pending_hits.items()])
+        self._conn.execute('COMMIT')
+        self._pending_hits = {}
+
+    def top(self, n=20):
+        """Domain dengan hit terbanyak: list (domain, hits, source, added_at)."""
+        with self._lock:
+            self._flush_hits()
+            return self._conn.execute(
+                'SELECT domain, hits, source, added_at FROM blocked_domains ORDER BY hits DESC, added_at DESC LIMIT ?',
+                (n,)).fetchall()
+
+    def stats(self):
+        return {
+            'entries': len(self),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'bloom_rejects': self.bloom_rejects,
+            'db_queries': self.db_queries,
+            'hit_rate': self.hits / self.lookups if self.lookups else None,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM blocked_domains')
+            self._rebuild()
+
+    def close(self):
+        with self._lock:
+            self._flush_hits()
+            self._conn.close()
@@ -0,0 +1,119 @@
+"""
+Ingest email mentah (format `emails.csv` Kaggle) menjadi kolom subject/date/body/sender.
+
+`emails.csv` dibaca per chunk, parsing dibagi ke beberapa proses
+(ProcessPoolExecutor) dan hasilnya disusun kembali sesuai urutan asli sebelum
+ditulis bertahap ke Parquet. Jumlah chunk yang sedang diproses dibatasi
+sehingga memori tetap stabil untuk seluruh korpus (~517k email).
+
+    python email_ingest.py emails.csv emails_parsed.parquet --workers 8
+"""
+import argparse
+import email
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+DEFAULT_CHUNKSIZE = 5000
+PARSED_COLUMNS = ['subject', 'date', 'body', 'sender']
+
+
+# Parsing Email Raw (sama dengan Cell 1 notebook), ditambah header From untuk blocklist domain
+def parse_raw_message(raw_message):
+    try:
+        msg = email.message_from_string(raw_message)
+        content = []
+        for part in msg.walk():
+            if part.get_content_type() == 'text/plain':
+                payload = part.get_payload()
+                if payload: content.append(payload)
+        return {
+            'subject': str(msg.get('Subject', '')),
+            'date': str(msg.get('Date', '')),
+            'body': ''.join(content),
+            'sender': str(msg.get('From', '')),
+        }
+    except Exception:
+        return {'subject': '', 'date': '', 'body': '', 'sender': ''}
+
+
+def parse_messages(messages):
+    """Parse satu chunk (dijalankan di worker process)."""
+    return pd.DataFrame([parse_raw_message(m) for m in messages], columns=PARSED_COLUMNS)
+
+
+def ordered_map(fn, items, workers=None):
+    """
+    Jalankan `fn(*item)` untuk setiap item di ProcessPoolExecutor dan yield
+    hasilnya sesuai urutan input. Maksimal 2 x workers item berada di antrean
+    agar RAM tetap terbatas.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, *item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_message_chunks(csv_path, chunksize=DEFAULT_CHUNKSIZE, nrows=None):
+    """Generator list pesan mentah (kolom 'message') per chunk dari emails.csv."""
+    with pd.read_csv(csv_path, usecols=['message'], chunksize=chunksize, nrows=nrows) as reader:
+        for chunk in reader:
+            yield chunk['message'].fillna('').astype(str).tolist()
+
+
+def iter_parsed_chunks(csv_path, chunksize=DEFAULT_CHUNKSIZE, workers=None, nrows=None):
+    """Generator DataFrame hasil parsing per chunk, urut sesuai file asli."""
+    offset = 0
+    tasks = ((messages,) for messages in iter_message_chunks(csv_path, chunksize, nrows))
+    for df in ordered_map(parse_messages, tasks, workers):
+        yield _with_index(df, offset)
+        offset += len(df)
+
+
+def _with_index(df, start):
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
+
+
+def ingest_to_parquet(csv_path, out_path, chunksize=DEFAULT_CHUNKSIZE, workers=None, nrows=None):
+    """Parse `emails.csv` secara paralel dan tulis subject/date/body ke Parquet per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(c, pa.string()) for c in PARSED_COLUMNS])
+    rows = 0
+    start = time.perf_counter()
+    with pq.ParquetWriter(out_path, schema) as writer:
+        for df in iter_parsed_chunks(csv_path, chunksize, workers, nrows):
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            rows += len(df)
+    elapsed = time.perf_counter() - start
+    return {'rows': rows, 'elapsed': elapsed, 'rows_per_sec': rows / elapsed if elapsed > 0 else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse emails.csv Enron ke Parquet secara paralel.')
+    parser.add_argument('csv_path')
+    parser.add_argument('out_path')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--nrows', type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"[INFO] Parsing '{args.csv_path}' dengan {args.workers or os.cpu_count()} worker...")
+    stats = ingest_to_parquet(args.csv_path, args.out_path, args.chunksize, args.workers, args.nrows)
+    print(f"[SUCCESS] {stats['rows']:,} email diparsing dalam {stats['elapsed']:.1f}s "
+          f"({stats['rows_per_sec']:,.0f} email/s) -> {args.out_path}")
+
+
+if __name__ == '__main__':
+    main()
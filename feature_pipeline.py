@@ -0,0 +1,188 @@
+"""
+Pipeline fitur tunggal (TF-IDF + metadata + MinMaxScaler) untuk notebook,
+aplikasi, dan Bulk Analysis.
+
+Model produksi dilatih dengan `hstack([X_tfidf, scaler.transform(meta)])`.
+`FeaturePipeline.combine` membangun matriks CSR akhir yang sama persis dalam
+satu lintasan: array data/indices/indptr dialokasikan sekali sesuai jumlah
+nnz, lalu diisi langsung tanpa matriks COO perantara. Nilai metadata 0 tidak
+disimpan (sama seperti hstack), karena XGBoost membedakan entri kosong
+(missing) dengan 0 eksplisit.
+
+Pipeline hanya berisi vectorizer + scaler yang sudah di-fit, sehingga bisa
+di-pickle dengan joblib atau dibangun ulang dari artefak Cell 11.
+"""
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from email_ingest import parse_raw_message
+from features import META_COLUMNS, SMALL_BATCH, caps_ratio, weekend_flag
+from model_registry import vectorizer_width
+
+_NON_ALPHA = re.compile(r'[^a-zA-Z\s]')
+# Teks dianggap email mentah RFC-822 bila baris pertamanya header umum
+_RAW_HEADER = re.compile(r'(?:Message-ID|Date|From|To|Subject|Return-Path|Received|MIME-Version|Content-Type):',
+                         re.IGNORECASE)
+
+
+def _parse_date(value):
+    if isinstance(value, datetime):
+        date = value
+    else:
+        try:
+            date = parsedate_to_datetime(str(value).strip())
+        except (TypeError, ValueError, IndexError):
+            return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.astimezone(timezone.utc)
+
+
+def _metadata_rows(dates, bodies):
+    # Jalur Python murni untuk batch kecil (scan tunggal): overhead pandas per
+    # panggilan (to_datetime, .str) lebih besar dari pekerjaannya sendiri
+    now = datetime.now(timezone.utc)
+    meta = np.empty((len(bodies), len(META_COLUMNS)))
+    for i, (value, body) in enumerate(zip(dates, bodies)):
+        date = _parse_date(value) or now
+        body_len = len(body)
+        meta[i] = (date.hour, 1 if date.weekday() >= 5 else 0, body_len,
+                   sum(map(str.isupper, body)) / body_len if body_len > 0 else 0.0)
+    return meta
+
+
+def metadata_matrix(dates, bodies):
+    """
+    Matriks (N x 4) hour, is_weekend, body_len, caps_ratio.
+    `dates` boleh string atau datetime; tanggal kosong/tidak valid memakai waktu sekarang.
+    """
+    if len(bodies) < SMALL_BATCH and all(isinstance(b, str) for b in bodies):
+        return _metadata_rows(list(dates), list(bodies))
+
+    bodies = pd.Series(bodies).reset_index(drop=True)
+    dates = pd.to_datetime(pd.Series(dates).reset_index(drop=True), errors='coerce', utc=True)
+    dates = dates.fillna(pd.Timestamp(datetime.now(timezone.utc)))
+
+    meta = np.empty((len(bodies), len(META_COLUMNS)))
+    meta[:, 0] = dates.dt.hour.to_numpy()
+    meta[:, 1] = weekend_flag(dates).to_numpy()
+    meta[:, 2] = bodies.str.len().to_numpy()
+    meta[:, 3] = caps_ratio(bodies).to_numpy()
+    return meta
+
+
+def parse_emails(texts):
+    """
+    (subjects, dates, bodies, senders) dari email mentah; teks tanpa header
+    dianggap body saja (sender kosong).
+    """
+    subjects, dates, bodies, senders = [], [], [], []
+    for text in texts:
+        if _RAW_HEADER.match(text):
+            parsed = parse_raw_message(text)
+        else:
+            parsed = {'subject': '', 'date': '', 'body': text, 'sender': ''}
+        subjects.append(parsed['subject'])
+        dates.append(parsed['date'])
+        bodies.append(parsed['body'])
+        senders.append(parsed['sender'])
+    return subjects, dates, bodies, senders
+
+
+class FeaturePipeline:
+    def __init__(self, vectorizer, scaler=None, clean=True):
+        self.vectorizer = vectorizer
+        self.scaler = scaler
+        # Samakan dengan clean_text di notebook (stopwords tidak ada di vocabulary)
+        self.clean = clean
+
+    @property
+    def n_features(self):
+        n_meta = len(META_COLUMNS) if self.scaler is not None else 0
+        return vectorizer_width(self.vectorizer) + n_meta
+
+    def normalize(self, body):
+        """Teks ternormalisasi: input TF-IDF yang identik menghasilkan string yang sama."""
+        if self.clean:
+            return ' '.join(_NON_ALPHA.sub('', body.lower()).split())
+        return ' '.join(body.lower().split())
+
+    def parse(self, texts):
+        """(bodies, meta) dari email mentah; meta None bila pipeline tanpa scaler."""
+        _, dates, bodies, _ = parse_emails(texts)
+        return bodies, self.metadata(dates, bodies)
+
+    def metadata(self, dates, bodies):
+        """Metadata mentah (N x 4) untuk `transform`; None bila pipeline tanpa scaler."""
+        return metadata_matrix(dates, bodies) if self.scaler is not None else None
+
+    def transform_text(self, bodies):
+        if self.clean:
+            sub = _NON_ALPHA.sub
+            bodies = [sub('', b.lower()) for b in bodies]
+        return self.vectorizer.transform(bodies)
+
+    def _scale(self, meta):
+        meta = np.array(meta, dtype=np.float64).reshape(-1, len(META_COLUMNS))
+        scale, minimum = getattr(self.scaler, 'scale_', None), getattr(self.scaler, 'min_', None)
+        if scale is None or minimum is None:
+            return self.scaler.transform(pd.DataFrame(meta, columns=META_COLUMNS))
+        # Operasi yang sama dengan MinMaxScaler.transform, tanpa validasi input per panggilan
+        meta *= scale
+        meta += minimum
+        if getattr(self.scaler, 'clip', False):
+            np.clip(meta, self.scaler.feature_range[0], self.scaler.feature_range[1], out=meta)
+        return meta
+
+    def combine(self, X_text, meta):
+        """CSR [X_text | scaler(meta)] dalam satu alokasi (setara hstack(...).tocsr())."""
+        X_text = X_text.tocsr()
+        if self.scaler is None or meta is None:
+            return X_text
+
+        meta = self._scale(meta)
+        n_rows, n_text = X_text.shape
+        nonzero = meta != 0
+        text_counts = np.diff(X_text.indptr)
+        meta_counts = nonzero.sum(axis=1)
+
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(text_counts + meta_counts, out=indptr[1:])
+        nnz = int(indptr[-1])
+        index_dtype = np.int32 if max(nnz, n_text + meta.shape[1]) < np.iinfo(np.int32).max else np.int64
+
+        data = np.empty(nnz, dtype=np.float64)
+        indices = np.empty(nnz, dtype=index_dtype)
+
+        # Entri TF-IDF: geser posisi setiap baris sebanyak entri metadata baris-baris sebelumnya
+        text_pos = np.arange(X_text.nnz) + np.repeat(indptr[:-1] - X_text.indptr[:-1], text_counts)
+        data[text_pos] = X_text.data
+        indices[text_pos] = X_text.indices
+
+        # Entri metadata diletakkan setelah entri TF-IDF pada baris yang sama
+        rows, cols = np.nonzero(nonzero)
+        rank = np.cumsum(nonzero, axis=1)[rows, cols] - 1
+        meta_pos = indptr[rows] + text_counts[rows] + rank
+        data[meta_pos] = meta[rows, cols]
+        indices[meta_pos] = n_text + cols
+
+        return csr_matrix((data, indices, indptr.astype(index_dtype)),
+                          shape=(n_rows, n_text + meta.shape[1]), copy=False)
+
+    def transform(self, bodies, meta=None):
+        """Matriks fitur final untuk body email yang sudah diparsing + metadata mentah (N x 4)."""
+        bodies = list(bodies)
+        X_text = self.transform_text(bodies)
+        if self.scaler is not None and meta is None:
+            meta = metadata_matrix([''] * len(bodies), bodies)
+        return self.combine(X_text, meta)
+
+    def transform_raw(self, texts):
+        """Matriks fitur final langsung dari email mentah (header Date dipakai bila ada)."""
+        bodies, meta = self.parse(texts)
+        return self.combine(self.transform_text(bodies), meta)
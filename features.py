@@ -0,0 +1,146 @@
+"""
+Feature engineering tervektorisasi untuk notebook Cell 2.
+
+Menggantikan `DataFrame.apply(axis=1)` dan lambda per karakter dengan operasi
+pandas `.str` / NumPy. Hasilnya identik (byte-per-byte) dengan fungsi per baris
+aslinya, yang tetap disimpan di sini sebagai referensi (`create_warning_label`,
+`clean_text_fast`) untuk pengujian dan benchmark (benchmarks/bench_features.py).
+"""
+import re
+import warnings
+from itertools import filterfalse
+
+import numpy as np
+import pandas as pd
+
+from keywords import KEYWORD_MATCHER, KEYWORDS
+
+LABEL_COLUMNS = ['warning', 'flag_fraud', 'flag_phishing', 'flag_threat']
+META_COLUMNS = ['hour', 'is_weekend', 'body_len', 'caps_ratio']
+
+# Di bawah ukuran ini overhead per panggilan operasi .str lebih mahal dari loop Python
+SMALL_BATCH = 64
+
+# Di-compile dengan `re` agar backend string pyarrow (RE2, \s hanya ASCII) tidak dipakai
+_NON_ALPHA = re.compile(r'[^a-zA-Z\s]')
+_ASCII_UPPER = re.compile(r'[A-Z]')
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+
+def _as_str(series):
+    # Setara str(x) per elemen: NaN -> 'nan' (astype(str) di pandas >= 3 mempertahankan NaN)
+    return series.map(str)
+
+
+def _per_unique(series, fn):
+    """
+    Hitung `fn` hanya sekali per nilai unik lalu sebar kembali ke semua baris.
+    Korpus Enron berisi banyak duplikat (email yang sama di folder sent,
+    all_documents, discussion_threads), sehingga ini memangkas kerja per baris.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    values = fn(pd.Series(uniques))
+    if isinstance(values, list):
+        # dtype=object: hindari array unicode lebar-tetap sepanjang teks terpanjang
+        values = np.array(values, dtype=object)
+    return np.asarray(values)[codes]
+
+
+# -----------------------------------------------------------------------------
+# Versi per baris (referensi, sama dengan notebook)
+# -----------------------------------------------------------------------------
+def create_warning_label(row):
+    text = (str(row['subject']) + " " + str(row['body'])).lower()
+
+    is_fraud = any(k in text for k in KEYWORDS['fraud'])
+    is_phishing = any(k in text for k in KEYWORDS['phishing'])
+    is_threat = any(k in text for k in KEYWORDS['threat'])
+
+    # Target Variable: 'warning' (1 = Dangerous, 0 = Safe)
+    label = 1 if (is_fraud or is_phishing or is_threat) else 0
+
+    return pd.Series([label, int(is_fraud), int(is_phishing), int(is_threat)])
+
+
+def clean_text_fast(text, stop_words=frozenset()):
+    text = str(text).lower()
+    text = _NON_ALPHA.sub('', text)
+    return ' '.join([w for w in text.split() if w not in stop_words])
+
+
+def load_stop_words(fallback=False):
+    """
+    Stopwords bahasa Inggris NLTK seperti Cell 1; satu-satunya sumber stopwords
+    untuk train_full dan benchmark. Korpus NLTK tidak diunduh di sini
+    (`python -m nltk.downloader stopwords`). Bila tidak ada: LookupError, atau
+    dengan `fallback=True` daftar sklearn beserta RuntimeWarning (vocabulary
+    berbeda dari notebook).
+    """
+    from nltk.corpus import stopwords
+    try:
+        return set(stopwords.words('english'))
+    except LookupError:
+        if not fallback:
+            raise LookupError("Stopwords NLTK tidak ditemukan; jalankan `python -m nltk.downloader stopwords`") from None
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    warnings.warn("Stopwords NLTK tidak tersedia, memakai ENGLISH_STOP_WORDS sklearn "
+                  "(vocabulary berbeda dari notebook)", RuntimeWarning, stacklevel=2)
+    return set(ENGLISH_STOP_WORDS)
+
+
+# -----------------------------------------------------------------------------
+# Versi tervektorisasi
+# -----------------------------------------------------------------------------
+def warning_labels(df):
+    """Kolom warning, flag_fraud, flag_phishing, flag_threat untuk seluruh DataFrame."""
+    text = _as_str(df['subject']) + " " + _as_str(df['body'])
+    flags = _per_unique(text, lambda t: KEYWORD_MATCHER.flags(t.str.lower(), list(KEYWORDS))).astype('int64')
+    warning = flags.any(axis=1).astype('int64')
+    return pd.DataFrame(np.column_stack([warning, flags]), columns=LABEL_COLUMNS, index=df.index)
+
+
+def _count_upper(bodies):
+    # Batch kecil (scan tunggal di aplikasi) dihitung langsung per karakter
+    if len(bodies) < SMALL_BATCH:
+        return np.array([sum(map(str.isupper, b)) for b in bodies], dtype='int64')
+    # Huruf kapital ASCII lewat str.count; hanya body yang memuat karakter non-ASCII
+    # (bisa berisi huruf kapital lain, mis. 'É') dihitung ulang dengan c.isupper()
+    counts = bodies.str.count(_ASCII_UPPER).to_numpy(dtype='int64', copy=True)
+    other = np.flatnonzero(bodies.str.contains(_NON_ASCII).to_numpy(dtype=bool))
+    counts[other] = [sum(map(str.isupper, bodies.iat[i])) for i in other]
+    return counts
+
+
+def caps_ratio(body):
+    """Rasio huruf kapital per body (0 untuk body kosong)."""
+    body = _as_str(body)
+    body_len = body.str.len()
+    caps = _per_unique(body, _count_upper)
+    return (caps / body_len).where(body_len > 0, 0.0)
+
+
+def weekend_flag(date):
+    return (date.dt.dayofweek >= 5).astype('int64')
+
+
+def metadata_features(df):
+    """hour, is_weekend, body_len, caps_ratio. Kolom 'date' harus sudah datetime (UTC)."""
+    return pd.DataFrame({
+        'hour': df['date'].dt.hour,
+        'is_weekend': weekend_flag(df['date']),
+        'body_len': df['body'].str.len(),
+        'caps_ratio': caps_ratio(df['body']),
+    }, index=df.index)
+
+
+def clean_text(text, stop_words=frozenset()):
+    """Lowercase, hapus non-huruf, buang stopwords (identik dengan clean_text_fast)."""
+    is_stop = frozenset(stop_words).__contains__
+
+    def clean(unique_text):
+        # Satu list comprehension tanpa overhead apply; .str.lower/.str.replace
+        # tidak lebih cepat di sini karena regex harus tetap memakai modul `re`
+        sub = _NON_ALPHA.sub
+        return [' '.join(filterfalse(is_stop, sub('', t.lower()).split())) for t in unique_text]
+
+    return pd.Series(_per_unique(_as_str(text), clean), index=text.index)
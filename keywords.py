@@ -0,0 +1,87 @@
+"""
+Kamus keyword bersama untuk aplikasi (radar "Threat Vector Analysis") dan
+notebook (label `warning` weak supervision), beserta matcher multi-pattern.
+
+KeywordMatcher mencari semua kategori sekaligus dalam satu lintasan teks
+menggunakan automaton Aho-Corasick (`pyahocorasick`) bila terinstal.
+Tanpa paket tersebut, matcher memakai `in` per keyword dengan short-circuit
+per kategori; di CPython cara ini tetap lebih cepat daripada satu regex
+alternation besar (lihat benchmarks/bench_keywords.py).
+
+Semantik hasil identik dengan `any(k in text.lower() for k in words)`.
+"""
+import numpy as np
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Keywords untuk Labeling Otomatis (Ground Truth) - notebook Cell 2
+KEYWORDS = {
+    'fraud': ['bank', 'fund', 'offshore', 'secret', 'confidential', 'bribe', 'fraud', 'illegal', 'laundering', 'bitcoin', 'btc'],
+    'phishing': ['verify', 'account', 'password', 'urgent', 'click', 'suspended', 'security', 'alert', 'login', 'update'],
+    'threat': ['kill', 'ruin', 'exposed', 'blackmail', 'warning', 'ending', 'career', 'dead', 'destroy', 'or else']
+}
+
+# Enhanced Keyword Dictionary untuk dimensi ancaman di aplikasi
+DIMENSION_KEYWORDS = {
+    'Urgency': ['urgent', 'immediate', 'now', 'alert', 'suspend', 'final warning', '12 hours'],
+    'Financial': ['bank', 'transfer', 'invoice', 'money', 'fund', 'payment', 'asset', 'seizure', 'laundering'],
+    'Credential': ['click', 'link', 'password', 'verify', 'login', 'portal', 'secure'],
+    'Aggression': ['kill', 'ruin', 'destroy', 'warning', 'legal action', 'prosecution', 'arrest', 'jail']
+}
+
+
+class KeywordMatcher:
+    def __init__(self, groups):
+        self.groups = {category: list(words) for category, words in groups.items()}
+        self.categories = list(self.groups)
+        self._bits = {category: 1 << i for i, category in enumerate(self.categories)}
+        self._full = (1 << len(self.categories)) - 1
+
+        # Satu keyword bisa masuk beberapa kategori (mis. 'bank', 'warning')
+        self._word_mask = {}
+        for category, words in self.groups.items():
+            for word in words:
+                self._word_mask[word] = self._word_mask.get(word, 0) | self._bits[category]
+
+        self._automaton = None
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for word, mask in self._word_mask.items():
+                self._automaton.add_word(word, mask)
+            self._automaton.make_automaton()
+
+    def mask(self, text):
+        """Bitmask kategori yang muncul di `text` (bit i = self.categories[i])."""
+        text = text.lower()
+        mask = 0
+        if self._automaton is not None:
+            for _, word_mask in self._automaton.iter(text):
+                mask |= word_mask
+                if mask == self._full:
+                    break
+            return mask
+
+        for category, words in self.groups.items():
+            bit = self._bits[category]
+            if not mask & bit and any(w in text for w in words):
+                mask |= bit
+        return mask
+
+    def hits(self, text):
+        """Set nama kategori yang terdeteksi."""
+        mask = self.mask(text)
+        return {c for c in self.categories if mask & self._bits[c]}
+
+    def flags(self, texts, categories=None):
+        """Matriks boolean (N x C) untuk banyak teks, kolom mengikuti `categories`."""
+        categories = categories or self.categories
+        bits = np.array([self._bits[c] for c in categories], dtype=np.int64)
+        masks = np.fromiter((self.mask(t) for t in texts), dtype=np.int64)
+        return (masks[:, None] & bits) != 0
+
+
+# Matcher tunggal untuk label notebook + dimensi aplikasi: satu lintasan per teks
+KEYWORD_MATCHER = KeywordMatcher({**DIMENSION_KEYWORDS, **KEYWORDS})
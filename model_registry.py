@@ -0,0 +1,202 @@
+"""
+Model Registry: memuat artefak hasil training notebook (Cell 11) untuk aplikasi.
+
+Artefak dimuat secara lazy (baru dibaca dari disk saat pertama kali diminta)
+dengan `joblib.load(mmap_mode='r')`, sehingga array numpy besar (idf, scaler)
+di-memory-map dan tidak disalin ke setiap worker Streamlit.
+"""
+import hashlib
+import json
+import os
+import re
+import warnings
+
+import joblib
+
+ARTIFACT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Set THREAT_ENGINE_ARTIFACTS=<dir> untuk memuat artefak dari folder lain (mis. compact_model/)
+ARTIFACT_DIR_ENV = 'THREAT_ENGINE_ARTIFACTS'
+
+ARTIFACT_FILES = {
+    'xgb': 'xgb_model_final.pkl',
+    'iso': 'iso_model_final.pkl',
+    'vectorizer': 'tfidf_vec_final.pkl',
+    'scaler': 'scaler_final.pkl',
+}
+# Isolation Forest boleh tidak ada (belum di-commit ke repo); engine lalu
+# memperlakukan setiap email sebagai inlier.
+OPTIONAL_ARTIFACTS = {'iso'}
+
+MANIFEST_FILE = 'model_manifest.json'
+
+# Dimensi fitur yang dipakai saat training (Cell 4): TF-IDF + 4 metadata
+N_TEXT_FEATURES = 5000
+META_COLUMNS = ['hour', 'is_weekend', 'body_len', 'caps_ratio']
+N_FEATURES = N_TEXT_FEATURES + len(META_COLUMNS)
+
+
+# Prefix log xgboost: "[10:51:13] WARNING: /path/error_msg.h:83: "
+_LOG_PREFIX = re.compile(r'^\[[\d:]+\] WARNING: \S+: ')
+
+
+class ArtifactError(RuntimeError):
+    """Artefak tidak ditemukan, rusak, atau dimensinya tidak cocok."""
+
+
+def _library_versions():
+    import sklearn
+    import xgboost
+    return {'sklearn': sklearn.__version__, 'xgboost': xgboost.__version__}
+
+
+def _major_minor(version):
+    return '.'.join(str(version).split('.')[:2])
+
+
+def _short_warning(message):
+    """Kalimat pertama pesan warning (tanpa prefix log xgboost) untuk ditampilkan di app."""
+    text = ' '.join(_LOG_PREFIX.sub('', str(message).strip()).split())
+    return text.split('. ')[0].rstrip('.')
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def vectorizer_width(vectorizer):
+    """Jumlah kolom output vectorizer (TfidfVectorizer atau vectorizer ringkas compact_model)."""
+    width = getattr(vectorizer, 'n_features_out', None)
+    return width if width is not None else len(getattr(vectorizer, 'vocabulary_', {}))
+
+
+def write_manifest(artifact_dir=ARTIFACT_DIR, n_text_features=N_TEXT_FEATURES, versions=None, **extra):
+    """
+    Tulis manifest (versi library + dimensi + hash file) setelah joblib.dump.
+    `versions` default = versi runtime; isi manual untuk artefak lama yang dibuat di lingkungan lain.
+    """
+    manifest = {
+        'versions': versions or _library_versions(),
+        'n_text_features': n_text_features,
+        'meta_columns': META_COLUMNS,
+        'files': {},
+        **extra,
+    }
+    for name, filename in ARTIFACT_FILES.items():
+        path = os.path.join(artifact_dir, filename)
+        if os.path.exists(path):
+            manifest['files'][name] = {'file': filename, 'sha256': _file_sha256(path)}
+
+    with open(os.path.join(artifact_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class ModelRegistry:
+    def __init__(self, artifact_dir=None, mmap_mode='r'):
+        self.artifact_dir = artifact_dir or os.environ.get(ARTIFACT_DIR_ENV) or ARTIFACT_DIR
+        self.mmap_mode = mmap_mode
+        self.warnings = []
+        self._loaded = {}
+
+    def path(self, name):
+        return os.path.join(self.artifact_dir, ARTIFACT_FILES[name])
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def get(self, name):
+        """Muat satu artefak (sekali saja per proses)."""
+        if name not in self._loaded:
+            path = self.path(name)
+            if not os.path.exists(path):
+                if name in OPTIONAL_ARTIFACTS:
+                    self._loaded[name] = None
+                    return None
+                raise ArtifactError(f"Artefak '{ARTIFACT_FILES[name]}' tidak ditemukan di {self.artifact_dir}")
+            try:
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter('always')
+                    self._loaded[name] = joblib.load(path, mmap_mode=self.mmap_mode)
+            except Exception as e:
+                raise ArtifactError(f"Gagal memuat '{ARTIFACT_FILES[name]}': {e}") from e
+            for w in caught:
+                if 'version' in str(w.message).lower():
+                    message = f"{ARTIFACT_FILES[name]}: {_short_warning(w.message)}"
+                    if message not in self.warnings:
+                        self.warnings.append(message)
+        return self._loaded[name]
+
+    def manifest(self):
+        path = os.path.join(self.artifact_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def metrics(self):
+        """Metrik XGBoost pada data uji dari manifest (Cell 11 / train_full), None bila tidak ada."""
+        manifest = self.manifest()
+        return (manifest or {}).get('training', {}).get('metrics')
+
+    def validate(self):
+        """Muat semua artefak dan cek versi + dimensi fitur. Raise ArtifactError bila tidak cocok."""
+        vectorizer = self.get('vectorizer')
+        scaler = self.get('scaler')
+        xgb = self.get('xgb')
+        iso = self.get('iso')
+
+        # Artefak ringkas (compact_model.py) mencatat jumlah fitur TF-IDF-nya di manifest
+        manifest = self.manifest()
+        expected_text = manifest.get('n_text_features', N_TEXT_FEATURES) if manifest else N_TEXT_FEATURES
+        expected_total = expected_text + len(META_COLUMNS)
+
+        n_text = vectorizer_width(vectorizer)
+        if n_text != expected_text:
+            raise ArtifactError(f"Vectorizer memiliki {n_text} fitur, diharapkan {expected_text}")
+        if getattr(scaler, 'n_features_in_', None) != len(META_COLUMNS):
+            raise ArtifactError(f"Scaler memiliki {getattr(scaler, 'n_features_in_', None)} kolom, diharapkan {len(META_COLUMNS)}")
+        for name, model in (('xgb', xgb), ('iso', iso)):
+            if model is None:
+                continue
+            n_in = getattr(model, 'n_features_in_', None)
+            if n_in != expected_total:
+                raise ArtifactError(f"{ARTIFACT_FILES[name]} dilatih dengan {n_in} fitur, diharapkan {expected_total}")
+        if iso is None:
+            self.warnings.append(f"{ARTIFACT_FILES['iso']} tidak ditemukan: komponen anomali dinonaktifkan")
+
+        if manifest is None:
+            self.warnings.append(f"{MANIFEST_FILE} tidak ditemukan: versi library dan hash artefak tidak diperiksa")
+        else:
+            current = _library_versions()
+            for lib, version in manifest.get('versions', {}).items():
+                if _major_minor(version) != _major_minor(current.get(lib, '')):
+                    self.warnings.append(f"Artefak dibuat dengan {lib} {version}, runtime {current.get(lib)}")
+            for name, entry in manifest.get('files', {}).items():
+                if self.exists(name) and _file_sha256(self.path(name)) != entry['sha256']:
+                    raise ArtifactError(f"{entry['file']} berubah sejak manifest ditulis (hash tidak cocok)")
+        return self
+
+    def fingerprint(self):
+        """Hash ringan (nama, ukuran, mtime) semua artefak; berubah bila file model diganti."""
+        h = hashlib.sha256()
+        for name in sorted(ARTIFACT_FILES) + [None]:
+            path = self.path(name) if name else os.path.join(self.artifact_dir, MANIFEST_FILE)
+            if os.path.exists(path):
+                stat = os.stat(path)
+                h.update(f'{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+        return h.hexdigest()[:16]
+
+    def footprint(self):
+        """Ukuran artefak yang sudah dimuat (byte, ukuran pickle di disk) sebagai perkiraan memori model."""
+        return {name: os.path.getsize(self.path(name)) for name, obj in self._loaded.items() if obj is not None}
+
+    def status(self):
+        """Ringkasan untuk halaman diagnostik."""
+        return {
+            name: {'file': filename, 'present': self.exists(name), 'loaded': self._loaded.get(name) is not None}
+            for name, filename in ARTIFACT_FILES.items()
+        }
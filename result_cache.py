@@ -0,0 +1,79 @@
+"""
+Cache hasil scoring (LRU + TTL) di depan PremiumThreatEngine.
+
+Kunci = hash teks ternormalisasi (lowercase, non-huruf dibuang, whitespace
+dirapatkan seperti `clean_text_fast`) + vektor metadata mentah + fingerprint
+artefak model. Teks yang berbeda hanya pada tanda baca/spasi/kapitalisasi
+tetapi metadata-nya sama menghasilkan input model yang identik, sehingga aman
+memakai hasil yang sama.
+
+Cache dibagikan ke semua sesi Streamlit lewat engine di `load_engine`, jadi
+akses dilindungi satu Lock.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 4096
+DEFAULT_TTL = 3600
+
+
+def content_key(normalized, meta_row=None, fingerprint=''):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(fingerprint.encode())
+    h.update(normalized.encode('utf-8', 'surrogatepass'))
+    if meta_row is not None:
+        h.update(meta_row.tobytes())
+    return h.digest()
+
+
+class ResultCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (self.ttl is None or now - entry[0] <= self.ttl):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+                self.evictions += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else None,
+        }
@@ -0,0 +1,233 @@
+"""
+Riwayat scan persisten (SQLite, append-only) untuk audit dan halaman System Logs.
+
+Setiap scan Threat Scanner dan setiap baris Bulk Analysis dicatat sebagai satu
+baris tabel `scans`: waktu, hash teks (blake2b 16 byte, teks aslinya tidak
+disimpan), skor, vektor dimensi, threshold, verdict, dan aksi mitigasi.
+
+Penulisan tidak dilakukan di jalur scan: `record` / `record_many` hanya
+menghitung hash teks (blake2b, ~1 us per email) dan memasukkan batch ke
+antrean, lalu satu thread penulis menulis semua batch yang menunggu dalam
+satu transaksi. Antrean hanya berisi digest 16 byte, bukan teks email,
+sehingga memorinya terbatas oleh jumlah baris dan tidak bergantung pada
+ukuran payload. Bila antrean penuh, batch dibuang dan dihitung di
+`stats()['dropped']` (scan tidak pernah menunggu disk).
+
+Baris tidak pernah di-UPDATE. Index `(ts, verdict)` menjawab agregasi threat
+rate per rentang waktu tanpa membaca tabel, dan index `verdict` (+ rowid
+implisit) melayani paging terfilter. Paging memakai keyset (`id < cursor`),
+sehingga halaman ke-N sama murahnya dengan halaman pertama berapa pun jumlah
+barisnya.
+"""
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# Set THREAT_ENGINE_HISTORY=<path> untuk memakai file riwayat lain
+HISTORY_PATH_ENV = 'THREAT_ENGINE_HISTORY'
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scan_history.db')
+
+logger = logging.getLogger(__name__)
+
+# Kolom dimensi, urutan sama dengan threat_engine.DIMENSIONS
+DIMENSION_COLUMNS = ['dim_urgency', 'dim_financial', 'dim_credential', 'dim_aggression', 'dim_social_eng']
+PAGE_COLUMNS = ['id', 'ts', 'text_hash', 'score', 'threshold', 'verdict', 'action', 'source'] + DIMENSION_COLUMNS
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scans (
+    id        INTEGER PRIMARY KEY,
+    ts        REAL NOT NULL,
+    text_hash BLOB NOT NULL,
+    score     REAL NOT NULL,
+    threshold REAL NOT NULL,
+    verdict   INTEGER NOT NULL,
+    action    TEXT,
+    source    TEXT,
+    {', '.join(f'{c} REAL' for c in DIMENSION_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS scans_ts ON scans (ts, verdict);
+CREATE INDEX IF NOT EXISTS scans_verdict ON scans (verdict);
+"""
+
+_INSERT = (f"INSERT INTO scans (ts, text_hash, score, threshold, verdict, action, source, "
+           f"{', '.join(DIMENSION_COLUMNS)}) VALUES ({', '.join('?' * (7 + len(DIMENSION_COLUMNS)))})")
+
+MAX_PENDING_ROWS = 200000   # batas baris di antrean penulis
+WRITE_BATCH_ROWS = 50000    # baris maksimum per transaksi
+
+
+def default_path():
+    return os.environ.get(HISTORY_PATH_ENV) or DEFAULT_PATH
+
+
+def text_hash(text):
+    return hashlib.blake2b(str(text).encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class ScanHistory:
+    def __init__(self, path=None, max_pending=MAX_PENDING_ROWS):
+        self.path = path or default_path()
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.executescript(_SCHEMA)
+
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.max_pending = max_pending
+        self._pending = 0
+        self._count_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='scan-history', daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # WAL + synchronous=NORMAL: commit tidak menunggu fsync
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    # ------------------------------------------------------------------
+    # Penulisan (non-blocking)
+    # ------------------------------------------------------------------
+    def record_many(self, texts, scores, threshold, actions, dims=None, source='scanner'):
+        """
+        Antrekan satu batch scan. `scores` 0-1, `threshold` 0-100 (slider),
+        `dims` matriks N x 5 (urutan DIMENSIONS) atau None. Return False bila
+        antrean penuh dan batch dibuang.
+        """
+        # Hash dihitung di sini: teks email tidak ikut tertahan di antrean
+        digests = [text_hash(t) for t in texts]
+        with self._count_lock:
+            if self._pending + len(digests) > self.max_pending:
+                self.dropped += len(digests)
+                return False
+            self._pending += len(digests)
+            self.queued += len(digests)
+        self._queue.put((time.time(), digests, [float(s) for s in scores], float(threshold), list(actions),
+                         None if dims is None else [[float(v) for v in row] for row in dims], source))
+        return True
+
+    def record(self, text, score, threshold, action, dims=None, source='scanner'):
+        """Satu scan; `dims` boleh dict {dimensi: skor} seperti hasil engine.predict."""
+        if isinstance(dims, dict):
+            dims = list(dims.values())
+        return self.record_many([text], [score], threshold, [action], None if dims is None else [dims], source)
+
+    @staticmethod
+    def _rows(batch):
+        ts, digests, scores, threshold, actions, dims, source = batch
+        empty = (None,) * len(DIMENSION_COLUMNS)
+        for i, (digest, score, action) in enumerate(zip(digests, scores, actions)):
+            yield (ts, digest, score, threshold, int(score * 100 > threshold), action, source,
+                   *(empty if dims is None else dims[i]))
+
+    def _write_loop(self):
+        # Koneksi tersendiri: transaksi penulis tidak memblokir query halaman System Logs (WAL)
+        conn = self._connect()
+        while True:
+            batches = [self._queue.get()]
+            # Gabungkan batch yang sudah menunggu ke satu transaksi
+            while batches[-1] is not None and sum(len(b[1]) for b in batches) < WRITE_BATCH_ROWS:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batches[-1] is None
+            if stop:
+                batches.pop()
+            rows = sum(len(b[1]) for b in batches)
+            try:
+                if batches:
+                    conn.execute('BEGIN')
+                    for batch in batches:
+                        conn.executemany(_INSERT, self._rows(batch))
+                    conn.execute('COMMIT')
+                    self.written += rows
+            except sqlite3.Error as e:
+                logger.warning("Riwayat scan gagal ditulis (%d baris dibuang): %s", rows, e)
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                with self._count_lock:
+                    self.dropped += rows
+            finally:
+                with self._count_lock:
+                    self._pending -= rows
+                for _ in range(len(batches) + stop):
+                    self._queue.task_done()
+            if stop:
+                conn.close()
+                return
+
+    def flush(self):
+        """Tunggu sampai semua batch di antrean tertulis."""
+        self._queue.join()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Query (semua agregasi dikerjakan SQLite)
+    # ------------------------------------------------------------------
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM scans').fetchone()[0]
+
+    def page(self, limit=50, before=None, verdict=None):
+        """
+        Maksimal `limit` scan terbaru dengan id < `before` (None = dari yang
+        terbaru), opsional hanya verdict 1/0. List tuple berurutan PAGE_COLUMNS;
+        id baris terakhir menjadi `before` halaman berikutnya.
+        """
+        where, params = [], []
+        if before is not None:
+            where.append('id < ?')
+            params.append(int(before))
+        if verdict is not None:
+            where.append('verdict = ?')
+            params.append(int(verdict))
+        sql = (f"SELECT id, ts, hex(text_hash), score, threshold, verdict, action, source, "
+               f"{', '.join(DIMENSION_COLUMNS)} FROM scans "
+               f"{'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY id DESC LIMIT ?")
+        with self._lock:
+            return self._conn.execute(sql, (*params, int(limit))).fetchall()
+
+    def summary(self, since=0):
+        """{'scans', 'threats', 'threat_rate'} untuk scan dengan ts >= since (epoch detik, 0 = semua)."""
+        with self._lock:
+            total, threats = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(verdict), 0) FROM scans WHERE ts >= ?',
+                (since,)).fetchone()
+        return {'scans': total, 'threats': threats, 'threat_rate': threats / total if total else None}
+
+    def timeline(self, bucket_seconds=3600, since=0):
+        """Jumlah scan dan threat per bucket waktu: list (bucket_start_ts, scans, threats)."""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT CAST(ts / ? AS INTEGER) * ? AS bucket, COUNT(*), SUM(verdict) FROM scans '
+                'WHERE ts >= ? GROUP BY bucket ORDER BY bucket',
+                (bucket_seconds, bucket_seconds, since)).fetchall()
+
+    def actions(self, since=0):
+        """Jumlah scan per aksi mitigasi: dict {action: count}."""
+        with self._lock:
+            return dict(self._conn.execute(
+                'SELECT action, COUNT(*) FROM scans WHERE ts >= ? GROUP BY action ORDER BY 2 DESC',
+                (since,)).fetchall())
+
+    def stats(self):
+        return {
+            'queued': self.queued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'pending': self._pending,
+        }
@@ -0,0 +1,294 @@
+"""
+Scoring service lokal (HTTP / Unix socket) untuk mail gateway.
+
+Engine dimuat sekali. Setiap request masuk ke antrean asyncio, lalu
+MicroBatcher menggabungkannya menjadi satu panggilan `score_many` (satu
+vectorize + satu XGBoost + satu IsolationForest) begitu batch mencapai
+`max_batch` pesan atau `max_wait` detik sejak pesan pertama. Scoring berjalan
+di thread terpisah sehingga event loop tetap menerima request. Bila antrean
+penuh, request langsung ditolak dengan 503 + Retry-After (backpressure).
+Parsing email dan pemeriksaan blocklist domain pengirim (domain_blocklist.py)
+ikut dikerjakan di panggilan batch tersebut, bukan di event loop.
+
+    python scoring_service.py --port 8765
+    python scoring_service.py --unix /tmp/threat.sock
+
+    POST /score     body = email mentah (text/plain) atau JSON {"text": "..."}
+    GET  /metrics   metrik Prometheus (engine + antrean)
+    GET  /health
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from telemetry import LatencyHistogram
+from threat_engine import PremiumThreatEngine
+
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT = 0.005
+DEFAULT_MAX_QUEUE = 4096
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+            500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class QueueFull(Exception):
+    """Antrean scoring penuh; klien sebaiknya mencoba lagi."""
+
+
+class MicroBatcher:
+    def __init__(self, engine, max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT, max_queue=DEFAULT_MAX_QUEUE):
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        # Satu thread scoring: batch berikutnya terkumpul selama batch sekarang di-score
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='score')
+        self._task = None
+
+        self.requests = 0
+        self.rejected = 0
+        self.blocklisted = 0
+        self.batches = 0
+        self.batched_messages = 0
+        self.max_depth = 0
+        self.queue_wait = LatencyHistogram()
+        self.latency = LatencyHistogram()
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, text):
+        """Masukkan satu pesan ke antrean dan tunggu hasilnya (final, xgb, iso, blocklisted_domain)."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((text, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFull() from None
+        self.requests += 1
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            start = time.perf_counter()
+            for _, _, queued in batch:
+                self.queue_wait.record(start - queued)
+            try:
+                # Parsing + blocklist + scoring dalam satu panggilan di thread scoring
+                final, xgb, iso, domains = await loop.run_in_executor(
+                    self._executor, self.engine.score_screened, [text for text, _, _ in batch])
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.batched_messages += len(batch)
+            self.blocklisted += sum(d is not None for d in domains)
+            done = time.perf_counter()
+            for i, (_, future, queued) in enumerate(batch):
+                self.latency.record(done - queued)
+                # Klien bisa sudah putus (future dibatalkan)
+                if not future.done():
+                    future.set_result((float(final[i]), float(xgb[i]), float(iso[i]), domains[i]))
+
+    def stats(self):
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_depth_max': self.max_depth,
+            'requests': self.requests,
+            'rejected': self.rejected,
+            'blocklisted': self.blocklisted,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_messages / self.batches if self.batches else 0.0,
+        }
+
+    def prometheus(self):
+        stats = self.stats()
+        lines = []
+        for name, value in stats.items():
+            lines += [f'# TYPE threat_service_{name} gauge', f'threat_service_{name} {value}']
+        for name, h in (('queue_wait_seconds', self.queue_wait), ('request_seconds', self.latency)):
+            lines.append(f'# TYPE threat_service_{name} summary')
+            for q in (0.5, 0.95, 0.99):
+                value = h.percentile(q)
+                if value is not None:
+                    lines.append(f'threat_service_{name}{{quantile="{q}"}} {value:.9f}')
+            lines.append(f'threat_service_{name}_sum {h.sum:.9f}')
+            lines.append(f'threat_service_{name}_count {h.count}')
+        return '\n'.join(lines) + '\n'
+
+
+class ScoringService:
+    def __init__(self, engine, batcher, threshold=60):
+        self.engine = engine
+        self.batcher = batcher
+        self.threshold = threshold
+
+    async def handle(self, reader, writer):
+        """Satu koneksi HTTP/1.1 (keep-alive) per klien."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'bad request'}, keep_alive=False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {'error': 'bad request'}, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': 'payload too large'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, payload, extra = await self._route(method, path.split('?')[0], headers, body)
+                except Exception as e:
+                    logger.warning("Request %s %s gagal: %r", method, path, e)
+                    status, payload, extra = 500, {'error': 'internal error'}, {}
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, headers, body):
+        if method == 'POST' and path == '/score':
+            if headers.get('content-type', '').startswith('application/json'):
+                try:
+                    text = str(json.loads(body)['text'])
+                except (ValueError, KeyError, TypeError):
+                    return 400, {'error': 'expected JSON {"text": "..."}'}, {}
+            else:
+                text = body.decode('utf-8', 'replace')
+            try:
+                final, xgb, iso, domain = await self.batcher.submit(text)
+            except QueueFull:
+                return 503, {'error': 'queue full'}, {'Retry-After': '1'}
+            return 200, {
+                'risk_score': final,
+                'xgb_prob': xgb,
+                'iso_score': iso,
+                'is_threat': final * 100 > self.threshold,
+                'blocklisted_domain': domain,
+            }, {}
+        if method == 'GET' and path == '/metrics':
+            return 200, self.engine.metrics_text() + self.batcher.prometheus(), {}
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'source': self.engine.source, **self.batcher.stats()}, {}
+        return 404, {'error': 'not found'}, {}
+
+    async def _respond(self, writer, status, payload, extra=None, keep_alive=True):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        head = [f'HTTP/1.1 {status} {_REASONS.get(status, "")}',
+                f'Content-Type: {content_type}',
+                f'Content-Length: {len(body)}',
+                f'Connection: {"keep-alive" if keep_alive else "close"}']
+        head += [f'{k}: {v}' for k, v in (extra or {}).items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(host='127.0.0.1', port=8765, unix_path=None, threshold=60,
+                max_batch=DEFAULT_MAX_BATCH, max_wait=DEFAULT_MAX_WAIT, max_queue=DEFAULT_MAX_QUEUE):
+    engine = PremiumThreatEngine()
+    batcher = MicroBatcher(engine, max_batch, max_wait, max_queue)
+    service = ScoringService(engine, batcher, threshold)
+    batcher.start()
+
+    if unix_path:
+        server = await asyncio.start_unix_server(service.handle, path=unix_path)
+        where = f'unix:{unix_path}'
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        where = f'http://{host}:{port}'
+    print(f"[INFO] Scoring service ({engine.source}) siap di {where} "
+          f"(batch {max_batch} pesan / {max_wait * 1e3:.1f} ms, antrean {max_queue})")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Scoring service lokal dengan micro-batching.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', default=None, help='path Unix socket (menggantikan host/port)')
+    parser.add_argument('--threshold', type=float, default=60)
+    parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT * 1e3)
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.threshold,
+                          args.max_batch, args.max_wait_ms / 1e3, args.max_queue))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
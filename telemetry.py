@@ -0,0 +1,167 @@
+"""
+Instrumentasi latency per tahap engine (blocklist, vectorize, XGBoost,
+IsolationForest, dimensi) untuk halaman System Logs dan endpoint Prometheus
+opsional.
+
+Setiap tahap dicatat ke histogram log-linear ala HDR: bucket i mencakup
+[2^(i/16), 2^((i+1)/16)) mikrodetik (resolusi ~4.4%), sehingga memori tetap
+konstan dan p50/p95/p99 bisa dihitung kapan saja. Pencatatan tidak memakai
+lock: hanya increment elemen list dan `deque.append` (atomik di CPython);
+pada kontensi tinggi satu-dua sampel bisa hilang, yang dapat diterima untuk
+metrik.
+
+Batch dicatat sebagai biaya per pesan dengan bobot N, sehingga scan tunggal
+dan Bulk Analysis berada pada skala yang sama.
+
+    THREAT_ENGINE_METRICS_PORT=9108 streamlit run app_uas_final.py
+    curl localhost:9108/metrics
+"""
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Set THREAT_ENGINE_METRICS_PORT agar metrik diekspor dalam format teks Prometheus
+METRICS_PORT_ENV = 'THREAT_ENGINE_METRICS_PORT'
+
+STAGES = ['blocklist', 'vectorize', 'xgboost', 'isolation_forest', 'dimensions', 'total']
+QUANTILES = [0.5, 0.95, 0.99]
+
+_SUB_BUCKETS = 16
+_N_BUCKETS = 36 * _SUB_BUCKETS  # 1 us .. ~19 jam
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * _N_BUCKETS
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds, n=1):
+        us = seconds * 1e6
+        i = min(int(math.log2(us) * _SUB_BUCKETS), _N_BUCKETS - 1) if us > 1 else 0
+        self.counts[i] += n
+        self.count += n
+        self.sum += seconds * n
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Perkiraan persentil (detik): titik tengah geometris bucket yang memuat rank q."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                return min(2 ** ((i + 0.5) / _SUB_BUCKETS) / 1e6, self.max)
+        return self.max
+
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+
+class Telemetry:
+    def __init__(self, window=4096):
+        self.started = time.time()
+        self.stages = {name: LatencyHistogram() for name in STAGES}
+        # Ring buffer (timestamp, jumlah pesan) untuk scans per menit
+        self._scans = deque(maxlen=window)
+        self.scans_total = 0
+
+    def record(self, stage, seconds, n=1):
+        if n > 0:
+            self.stages[stage].record(seconds / n, n)
+
+    @contextmanager
+    def stage(self, name, n=1):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, n)
+
+    def record_scan(self, n=1):
+        self._scans.append((time.time(), n))
+        self.scans_total += n
+
+    def scans_per_minute(self, now=None):
+        now = now or time.time()
+        return sum(n for t, n in list(self._scans) if now - t <= 60)
+
+    def summary(self):
+        """Ringkasan per tahap dalam milidetik (None bila belum ada data)."""
+        ms = lambda v: None if v is None else v * 1e3
+        return {
+            name: {
+                'count': h.count,
+                'mean': ms(h.mean()),
+                **{f'p{int(q * 100)}': ms(h.percentile(q)) for q in QUANTILES},
+            }
+            for name, h in self.stages.items()
+        }
+
+    def prometheus(self, gauges=None):
+        """Metrik dalam format teks Prometheus (summary per tahap + gauge tambahan)."""
+        lines = [
+            '# HELP threat_engine_stage_seconds Latency per pesan untuk setiap tahap engine.',
+            '# TYPE threat_engine_stage_seconds summary',
+        ]
+        for name, h in self.stages.items():
+            for q in QUANTILES:
+                value = h.percentile(q)
+                if value is not None:
+                    lines.append(f'threat_engine_stage_seconds{{stage="{name}",quantile="{q}"}} {value:.9f}')
+            lines.append(f'threat_engine_stage_seconds_sum{{stage="{name}"}} {h.sum:.9f}')
+            lines.append(f'threat_engine_stage_seconds_count{{stage="{name}"}} {h.count}')
+
+        lines += [
+            '# TYPE threat_engine_scans_total counter',
+            f'threat_engine_scans_total {self.scans_total}',
+            '# TYPE threat_engine_scans_per_minute gauge',
+            f'threat_engine_scans_per_minute {self.scans_per_minute()}',
+        ]
+        for name, value in (gauges or {}).items():
+            lines += [f'# TYPE threat_engine_{name} gauge', f'threat_engine_{name} {value}']
+        return '\n'.join(lines) + '\n'
+
+
+def process_memory():
+    """RSS proses saat ini (byte), atau None bila tidak bisa dibaca."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def serve_metrics(render, port, host='127.0.0.1'):
+    """Jalankan endpoint GET /metrics (thread daemon) yang mengembalikan `render()`."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,39 @@
+"""ProjectedIsolationForest: penelusuran datar harus sama dengan API publik IsolationForest."""
+import numpy as np
+import pytest
+from scipy import sparse
+
+import anomaly
+from anomaly import ProjectedIsolationForest
+
+
+@pytest.fixture(scope='module')
+def X():
+    return sparse.random(3000, 400, density=0.02, random_state=0, format='csr')
+
+
+@pytest.fixture(scope='module')
+def iso(X):
+    return ProjectedIsolationForest(n_components=16, random_state=0).fit(X)
+
+
+def test_flat_forest_matches_decision_function(iso, X):
+    assert iso.forest_ is not None
+    Z = iso.transform(X[:anomaly.FLAT_MAX_ROWS])
+    np.testing.assert_allclose(iso.decision_function(X[:anomaly.FLAT_MAX_ROWS]),
+                               iso.iso_.decision_function(Z), rtol=0, atol=1e-12)
+
+
+def test_large_batch_uses_public_api(iso, X):
+    Z = iso.transform(X)
+    np.testing.assert_array_equal(iso.score_samples(X), iso.iso_.score_samples(Z))
+
+
+def test_falls_back_to_public_api_when_flat_forest_cannot_be_built(X, monkeypatch):
+    def broken(_):
+        raise AttributeError('tree_')
+    monkeypatch.setattr(anomaly, '_FlatForest', broken)
+    with pytest.warns(RuntimeWarning):
+        iso = ProjectedIsolationForest(n_components=16, random_state=0).fit(X)
+    assert iso.forest_ is None
+    np.testing.assert_array_equal(iso.score_samples(X[:10]), iso.iso_.score_samples(iso.transform(X[:10])))
@@ -0,0 +1,64 @@
+"""Blocklist hanya mencocokkan domain pengirim (header From), bukan alamat di body."""
+import pytest
+
+from domain_blocklist import DomainBlocklist
+from soar import sender_domain
+from threat_engine import BLOCKLIST_SCORES, PremiumThreatEngine
+
+CLEAN_SENDER = """Message-ID: <1.JavaMail@thyme>
+Date: Mon, 14 May 2001 16:39:00 -0700 (PDT)
+From: alice@partner-clean.org
+To: bob@enron.com
+Subject: FW: warning about phishing
+
+Please ignore anything sent from billing@evil-payments.com, it is a scam.
+"""
+
+BLOCKED_SENDER = """Message-ID: <2.JavaMail@thyme>
+Date: Mon, 14 May 2001 16:39:00 -0700 (PDT)
+From: "Billing" <billing@evil-payments.com>
+To: bob@enron.com
+Subject: invoice
+
+Please see the attached invoice.
+"""
+
+
+@pytest.fixture(scope='module')
+def engine(tmp_path_factory):
+    blocklist = DomainBlocklist(str(tmp_path_factory.mktemp('bl') / 'blocklist.db'))
+    blocklist.add('evil-payments.com')
+    engine = PremiumThreatEngine(cache_size=0, blocklist=blocklist, allow_train=True)
+    yield engine
+    blocklist.close()
+
+
+def test_sender_domain():
+    assert sender_domain('"Billing" <Billing@Evil-Payments.com>') == 'evil-payments.com'
+    assert sender_domain('alice@partner-clean.org') == 'partner-clean.org'
+    assert sender_domain('') is None
+    assert sender_domain('undisclosed-recipients') is None
+
+
+def test_body_mention_of_blocked_domain_is_not_blocked(engine):
+    assert engine.screen(CLEAN_SENDER) is None
+    final_score, xgb_prob, _ = engine.score_many([CLEAN_SENDER])
+    assert (final_score[0], xgb_prob[0]) != BLOCKLIST_SCORES[:2]
+
+
+def test_body_only_text_gets_no_blocklist_verdict(engine):
+    body = CLEAN_SENDER.split('\n\n', 1)[1]
+    assert engine.screen(body) is None
+    assert engine.score_many([body])[0][0] != BLOCKLIST_SCORES[0]
+
+
+def test_blocked_sender_is_blocked(engine):
+    assert engine.screen(BLOCKED_SENDER) == 'evil-payments.com'
+    assert engine.score_many([BLOCKED_SENDER])[0][0] == BLOCKLIST_SCORES[0]
+
+
+def test_score_screened_reports_blocked_sender_per_row(engine):
+    final_score, _, _, domains = engine.score_screened([CLEAN_SENDER, BLOCKED_SENDER])
+    assert domains == [None, 'evil-payments.com']
+    assert final_score[1] == BLOCKLIST_SCORES[0]
+    assert final_score[0] == engine.score_many([CLEAN_SENDER])[0][0]
@@ -0,0 +1,49 @@
+"""Artefak ringkas (mode pruned) harus memberi skor identik dengan artefak asli."""
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest
+
+from anomaly import ProjectedIsolationForest
+from benchmarks.synthetic import make_bodies, make_emails
+from compact_model import compare, export_compact
+from model_registry import ARTIFACT_FILES, ModelRegistry, write_manifest
+from threat_engine import PremiumThreatEngine
+
+
+def _anomaly_model(kind, X):
+    if kind == 'projected':
+        return ProjectedIsolationForest(n_components=16, projection='random', random_state=0).fit(X)
+    return IsolationForest(n_estimators=50, max_features=0.5, random_state=0).fit(X)
+
+
+@pytest.fixture(scope='module')
+def features():
+    engine = PremiumThreatEngine(cache_size=0, blocklist=False)
+    bodies, meta = engine.pipeline.parse(make_emails(800, seed=5)['message'].tolist())
+    return engine.pipeline.transform(bodies, meta)
+
+
+@pytest.mark.parametrize('iso', [None, 'projected', 'sklearn'])
+def test_pruned_export_scores_identical(tmp_path, features, iso):
+    source = ModelRegistry()
+    full_dir, compact_dir = str(tmp_path / 'full'), str(tmp_path / 'compact')
+    os.makedirs(full_dir)
+    for name in ('xgb', 'vectorizer', 'scaler'):
+        shutil.copy2(source.path(name), os.path.join(full_dir, ARTIFACT_FILES[name]))
+    if iso is not None:
+        joblib.dump(_anomaly_model(iso, features), os.path.join(full_dir, ARTIFACT_FILES['iso']))
+    write_manifest(full_dir, versions=source.manifest()['versions'], training=source.manifest()['training'])
+
+    info = export_compact(compact_dir, ModelRegistry(full_dir))
+    assert info['mode'] == 'pruned'
+    assert info['text_features_kept'] < info['text_features']
+    assert ModelRegistry(compact_dir).metrics() == source.metrics()
+
+    rows, agreement = compare(full_dir, compact_dir, make_bodies(400, seed=9))
+    assert agreement['identical'], agreement
+    assert agreement['verdict_flips'] == 0
+    assert rows['compact']['n_features'] < rows['full']['n_features']
@@ -0,0 +1,54 @@
+"""CorpusCache.tfidf hanya membaca segmen yang memuat hash yang diminta."""
+import os
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from benchmarks.synthetic import make_emails
+from corpus_cache import CorpusCache, vectorizer_fingerprint
+
+
+@pytest.fixture(scope='module')
+def cache(tmp_path_factory):
+    root = tmp_path_factory.mktemp('corpus')
+    emails = make_emails(300, seed=3)
+    cache = CorpusCache(str(root / 'cache'))
+    # Dua update -> dua segmen
+    for i, part in enumerate((emails[:200], emails[200:])):
+        path = str(root / f'emails_{i}.csv')
+        part.to_csv(path, index=False)
+        cache.update(path, chunksize=100, workers=1)
+    assert len(cache.segments()) == 2
+    return cache
+
+
+@pytest.fixture(scope='module')
+def vectorizer(cache):
+    return TfidfVectorizer(max_features=500).fit(cache.load(columns=['clean_text'])['clean_text'])
+
+
+def test_tfidf_matches_transform_in_requested_order(cache, vectorizer):
+    df = cache.load(columns=['clean_text'])
+    rows = [250, 3, 299, 3, 120]
+    X = cache.tfidf(vectorizer, df['hash'].iloc[rows])
+    expected = vectorizer.transform(df['clean_text'].iloc[rows])
+    assert X.shape == expected.shape
+    np.testing.assert_allclose(X.toarray(), expected.toarray())
+
+
+def test_tfidf_reads_only_segments_with_requested_hashes(cache, tmp_path):
+    vectorizer = TfidfVectorizer(max_features=50).fit(cache.load(columns=['clean_text'])['clean_text'])
+    hashes = cache.load(columns=['hash'])['hash'].iloc[:5]
+    cache.tfidf(vectorizer, hashes)
+    folder = os.path.join(cache.root, 'tfidf', vectorizer_fingerprint(vectorizer))
+    assert sorted(os.listdir(folder)) == [os.path.basename(cache.segments()[0]).replace('.parquet', '.npz')]
+
+
+def test_tfidf_empty_request_and_empty_cache(cache, vectorizer, tmp_path):
+    width = len(vectorizer.vocabulary_)
+    assert cache.tfidf(vectorizer, []).shape == (0, width)
+    empty = CorpusCache(str(tmp_path / 'empty'))
+    assert empty.tfidf(vectorizer, []).shape == (0, width)
+    with pytest.raises(KeyError):
+        empty.tfidf(vectorizer, ['0' * 32])
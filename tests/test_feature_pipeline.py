@@ -0,0 +1,33 @@
+"""FeaturePipeline.combine harus identik dengan hstack([X_text, scaler(meta)]).tocsr()."""
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, hstack
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import MinMaxScaler
+
+from benchmarks.synthetic import make_emails
+from feature_pipeline import FeaturePipeline, metadata_matrix, parse_emails
+from features import META_COLUMNS
+
+
+def test_combine_matches_hstack():
+    _, dates, bodies, _ = parse_emails(make_emails(300, seed=11)['message'].tolist())
+    # Baris tanpa token TF-IDF dan baris metadata yang seluruhnya nol setelah scaling
+    bodies += ['', '1234 !!!']
+    dates += dates[:2]
+    vectorizer = TfidfVectorizer(max_features=500).fit(bodies)
+    meta = metadata_matrix(dates, bodies)
+    meta[-1] = meta.min(axis=0)
+    pipeline = FeaturePipeline(vectorizer, MinMaxScaler().fit(pd.DataFrame(meta, columns=META_COLUMNS)))
+
+    X_text = pipeline.transform_text(bodies)
+    expected = hstack([X_text, csr_matrix(pipeline.scaler.transform(pd.DataFrame(meta, columns=META_COLUMNS)))]).tocsr()
+    combined = pipeline.combine(X_text, meta)
+
+    assert combined.shape == expected.shape
+    np.testing.assert_array_equal(combined.indptr, expected.indptr)
+    np.testing.assert_array_equal(combined.indices, expected.indices)
+    np.testing.assert_allclose(combined.data, expected.data, rtol=1e-12)
+    assert X_text[-2].nnz == 0 and combined[-1, X_text.shape[1]:].nnz == 0
+    # Tanpa scaler, combine mengembalikan TF-IDF apa adanya
+    assert (FeaturePipeline(vectorizer).combine(X_text, meta) != X_text).nnz == 0
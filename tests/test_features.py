@@ -0,0 +1,39 @@
+"""warning_labels tervektorisasi harus identik dengan create_warning_label (loop asli Cell 2)."""
+import numpy as np
+import pandas as pd
+
+from features import LABEL_COLUMNS, caps_ratio, create_warning_label, warning_labels
+
+SUBJECTS = ['RE: Quarterly Report', 'URGENT!!! Verify', 'fw: lunch?', np.nan, 'Or Else...', '', 'BTC/ETH', 'Re: Career-Day']
+
+BODIES = [
+    'Please find the numbers attached. Thanks, Jeff',
+    'Your ACCOUNT has been Suspended; click here -> http://x.example/login',
+    'Lunch at noon? Bring the FUNDING memo.',
+    'Pay up, or else. You will be EXPOSED!',
+    'or\nelse the deal is off',
+    'Bankruptcy filing (confidential) - do not forward.',
+    'Send 0.5 btc to wallet #1234, no questions.',
+    'Meeting re: pipeline capacity; see attached.',
+    '',
+    'Kill-switch tested OK... Warning: disk 90% full!',
+]
+
+
+def test_warning_labels_match_reference_loop():
+    df = pd.DataFrame({
+        'subject': [SUBJECTS[i % len(SUBJECTS)] for i in range(len(BODIES) * 3)],
+        'body': [BODIES[i % len(BODIES)] for i in range(len(BODIES) * 3)],
+    })
+    expected = df.apply(create_warning_label, axis=1).set_axis(LABEL_COLUMNS, axis=1).astype('int64')
+    pd.testing.assert_frame_equal(warning_labels(df), expected)
+    # Korpus harus memuat baris berlabel dan tidak berlabel
+    assert 0 < expected['warning'].sum() < len(df)
+
+
+def test_caps_ratio_matches_reference_loop():
+    bodies = pd.Series((BODIES + ['Déjà VU, ÉTÉ à Zürich', 'ΣΟΦΙΑ ǅ titlecase ß', 'ＡＢＣ full width', 'İstanbul']) * 10)
+    expected = bodies.apply(lambda x: sum(1 for c in str(x) if c.isupper()) / len(x) if len(x) > 0 else 0)
+    np.testing.assert_array_equal(caps_ratio(bodies).to_numpy(), expected.to_numpy())
+    # Batch kecil memakai jalur per karakter
+    np.testing.assert_array_equal(caps_ratio(bodies[:5]).to_numpy(), expected[:5].to_numpy())
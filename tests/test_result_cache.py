@@ -0,0 +1,62 @@
+"""ResultCache: urutan eviksi LRU, kedaluwarsa TTL, dan kunci per versi model."""
+import numpy as np
+
+import result_cache
+from result_cache import ResultCache, content_key
+from threat_engine import PremiumThreatEngine
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(maxsize=2, ttl=None)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # 'a' jadi yang terbaru
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c'), len(cache)) == (1, 3, 2)
+    cache.put('a', 10)  # update tidak menambah entri
+    assert (cache.get('a'), len(cache)) == (10, 2)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expires_entries(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache.time, 'monotonic', clock)
+    cache = ResultCache(maxsize=8, ttl=60)
+    cache.put('a', 1)
+    clock.now += 60
+    assert cache.get('a') == 1
+    clock.now += 1
+    assert cache.get('a') is None and len(cache) == 0
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 1, 1)
+
+
+def test_key_depends_on_model_version_and_metadata():
+    meta = np.array([3.0, 120.0, 0.1, 0.0])
+    key = content_key('verify your password', meta, 'v1')
+    assert key == content_key('verify your password', meta.copy(), 'v1')
+    assert key != content_key('verify your password', meta, 'v2')
+    assert key != content_key('verify your password', meta + 1, 'v1')
+    assert key != content_key('verify your password', None, 'v1')
+
+
+def test_engine_cache_is_keyed_by_fingerprint():
+    engine = PremiumThreatEngine(cache_size=16, blocklist=False)
+    text = 'From: a@example.com\n\nVerify your PASSWORD now!!'
+    first, _, _ = engine.score_many([text])
+    engine.score_many([text])
+    assert engine.cache.stats()['hits'] == 1 and len(engine.cache) == 1
+    # Artefak model berganti: entri lama tidak boleh dipakai lagi
+    engine.fingerprint = engine.fingerprint + '-next'
+    again, _, _ = engine.score_many([text])
+    assert engine.cache.stats()['hits'] == 1 and len(engine.cache) == 2
+    np.testing.assert_allclose(again, first)
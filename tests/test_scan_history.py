@@ -0,0 +1,71 @@
+"""ScanHistory: paging keyset, filter verdict, dan agregasi di SQLite."""
+import pytest
+
+import scan_history
+from scan_history import PAGE_COLUMNS, ScanHistory, text_hash
+from soar import ALLOW, BLOCK, QUARANTINE
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    clock = iter([1000.0, 1000.0 + 3600, 1000.0 + 7200 + 5])
+    monkeypatch.setattr(scan_history.time, 'time', lambda: next(clock))
+    h = ScanHistory(str(tmp_path / 'history.db'))
+    # Batch 1 (jam ke-0): 4 scan bulk dengan dimensi, 2 di atas threshold 60
+    h.record_many([f'bulk {i}' for i in range(4)], [0.9, 0.2, 0.65, 0.1], 60,
+                  [BLOCK, ALLOW, QUARANTINE, ALLOW], [[0.1 * i] * 5 for i in range(4)], source='bulk')
+    # Batch 2 (jam ke-1): 3 scan scanner tanpa dimensi
+    h.record_many(['a', 'b', 'c'], [0.95, 0.3, 0.61], 60, [BLOCK, ALLOW, QUARANTINE])
+    # Batch 3 (jam ke-2): satu scan dengan dims dict seperti engine.predict
+    h.record('d', 0.99, 80, BLOCK, {'Urgency': 0.5, 'Financial': 0.4, 'Credential': 0.3, 'Aggression': 0.2, 'Social Eng.': 0.1})
+    h.flush()
+    yield h
+    h.close()
+
+
+def test_keyset_pages_cover_every_row_once(history):
+    ids, before = [], None
+    while True:
+        rows = history.page(limit=3, before=before)
+        if not rows:
+            break
+        assert len(rows) <= 3
+        ids += [r[0] for r in rows]
+        before = rows[-1][0]
+    assert ids == sorted(ids, reverse=True) and len(ids) == len(set(ids)) == len(history) == 8
+
+    newest = dict(zip(PAGE_COLUMNS, history.page(limit=1)[0]))
+    assert newest['text_hash'] == text_hash('d').hex().upper()
+    assert (newest['verdict'], newest['action'], newest['source']) == (1, BLOCK, 'scanner')
+    assert [newest[c] for c in PAGE_COLUMNS[-5:]] == [0.5, 0.4, 0.3, 0.2, 0.1]
+
+
+def test_verdict_filter_pages(history):
+    threats = history.page(limit=2, verdict=1)
+    threats += history.page(limit=2, before=threats[-1][0], verdict=1)
+    threats += history.page(limit=2, before=threats[-1][0], verdict=1)
+    assert [r[5] for r in threats] == [1] * 5
+    assert [r[3] for r in threats] == [0.99, 0.61, 0.95, 0.65, 0.9]
+    # Baris scanner tanpa dimensi disimpan NULL
+    assert all(v is None for v in history.page(limit=1, before=threats[0][0])[0][-5:])
+
+
+def test_aggregates(history):
+    assert history.summary() == {'scans': 8, 'threats': 5, 'threat_rate': 5 / 8}
+    assert history.summary(since=1000.0 + 3600) == {'scans': 4, 'threats': 3, 'threat_rate': 0.75}
+    assert history.summary(since=10 ** 10) == {'scans': 0, 'threats': 0, 'threat_rate': None}
+    assert history.timeline(3600) == [(0, 4, 2), (3600, 3, 2), (7200, 1, 1)]
+    assert history.actions() == {BLOCK: 3, ALLOW: 3, QUARANTINE: 2}
+    assert history.actions(since=1000.0 + 7200) == {BLOCK: 1}
+    assert history.stats() == {'queued': 8, 'written': 8, 'dropped': 0, 'pending': 0}
+
+
+def test_full_queue_drops_batch(tmp_path):
+    h = ScanHistory(str(tmp_path / 'history.db'), max_pending=2)
+    try:
+        assert not h.record_many(['a', 'b', 'c'], [0.1, 0.2, 0.3], 60, [ALLOW] * 3)
+        assert h.record('d', 0.1, 60, ALLOW)
+        h.flush()
+        assert len(h) == 1 and h.stats()['dropped'] == 3
+    finally:
+        h.close()
@@ -0,0 +1,77 @@
+"""run_mitigation tervektorisasi harus identik dengan loop iterrows asli Cell 10."""
+import re
+
+import numpy as np
+import pandas as pd
+
+from soar import MitigationPolicy, run_mitigation
+
+
+# Salinan fungsi asli notebook Cell 10 (per baris)
+def extract_domain(text):
+    match = re.search(r'[\w\.-]+@([\w\.-]+\.[\w\.-]+)', str(text))
+    if match:
+        return match.group(1).lower()
+    return None
+
+
+def run_mitigation_engine(row_text, xgb_prob, iso_score, iso_threshold):
+    risk_score = xgb_prob * 100
+    is_anomaly = iso_score >= iso_threshold
+    if is_anomaly:
+        risk_score += 15
+    if 'kill' in row_text and 'money' in row_text:
+        risk_score = 100
+    risk_score = min(risk_score, 100)
+
+    action = "ALLOW"
+    if risk_score >= 85:
+        action = "BLOCK_DOMAIN_&_DELETE"
+    elif risk_score >= 50:
+        action = "QUARANTINE_EMAIL"
+    else:
+        action = "MONITOR_ONLY"
+    if risk_score < 20:
+        action = "ALLOW"
+    return risk_score, action, is_anomaly
+
+
+BODIES = [
+    'Contact John.Doe@Enron.COM for details',
+    'no address here',
+    'we will kill the deal unless the money arrives',
+    'mail me at a@b and x@y.example.org',
+    'reply to @nobody.com or jeff@sub.enron.net.',
+    'user_1@mail-server.co.uk, please send money',
+    'kill switch engaged',
+    '',
+]
+
+
+def test_run_mitigation_matches_iterrows_loop():
+    rng = np.random.default_rng(0)
+    n = 400
+    bodies = pd.Series([BODIES[i % len(BODIES)] for i in range(n)], index=np.arange(n) * 3 + 100)
+    sample_data = pd.DataFrame({'body': bodies, 'clean_text': bodies.str.lower()})
+    # predict_proba XGBoost menghasilkan float32; sertakan nilai tepat di ambang kebijakan
+    xgb_probs = rng.random(n).astype(np.float32)
+    xgb_probs[:6] = np.array([0.85, 0.5, 0.2, 0.70, 0.35, 0.05], dtype=np.float32)
+    iso_scores = rng.normal(0, 0.1, n)
+    iso_scores[:3] = 0.0
+    best_threshold = 0.0
+
+    expected = []
+    for i, (idx, row) in enumerate(sample_data.iterrows()):
+        score, action, anomaly = run_mitigation_engine(row['clean_text'], xgb_probs[i], iso_scores[i], best_threshold)
+        expected.append((idx, score, action, anomaly, extract_domain(row['body'])))
+    expected = pd.DataFrame(expected, columns=['index', 'risk_score', 'action', 'is_anomaly', 'suspect_domain']).set_index('index')
+
+    policy = MitigationPolicy(iso_threshold=best_threshold)
+    report = run_mitigation(xgb_probs, iso_scores, sample_data['clean_text'], sample_data['body'], policy)
+
+    assert report.index.equals(sample_data.index)
+    np.testing.assert_array_equal(report['risk_score'].to_numpy(), expected['risk_score'].to_numpy(dtype=float))
+    assert report['action'].tolist() == expected['action'].tolist()
+    assert report['is_anomaly'].tolist() == expected['is_anomaly'].tolist()
+    assert report['suspect_domain'].where(report['suspect_domain'].notna(), None).tolist() == expected['suspect_domain'].tolist()
+    assert set(report['action']) == {'ALLOW', 'MONITOR_ONLY', 'QUARANTINE_EMAIL', 'BLOCK_DOMAIN_&_DELETE'}
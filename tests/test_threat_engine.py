@@ -0,0 +1,66 @@
+"""PremiumThreatEngine dengan artefak bawaan repo."""
+import numpy as np
+import pytest
+
+from anomaly import ProjectedIsolationForest
+from benchmarks.synthetic import make_emails
+from feature_pipeline import parse_emails
+from threat_engine import PremiumThreatEngine
+
+PHISHING = """From: security@account-alerts.example
+Subject: URGENT: account suspended
+
+URGENT verify your password now or your account will be suspended. Click the login link and wire the fund today.
+"""
+
+BENIGN = """From: jeff.dasovich@enron.com
+Subject: lunch
+
+Lunch tomorrow? The quarterly report can wait until Monday.
+"""
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return PremiumThreatEngine(cache_size=0, blocklist=False)
+
+
+@pytest.fixture(scope='module')
+def projected_iso(engine):
+    _, dates, bodies, _ = parse_emails(make_emails(1500, seed=7)['message'].tolist())
+    X = engine.pipeline.transform(bodies, engine.pipeline.metadata(dates, bodies))
+    return ProjectedIsolationForest(n_components=16, projection='random', random_state=0).fit(X)
+
+
+@pytest.mark.parametrize('threshold', [60, 80])
+def test_continuous_anomaly_score_keeps_known_verdicts(engine, projected_iso, threshold):
+    """Skor anomali kontinu (0.10..0.90) tidak mengubah verdict pesan yang jelas phishing / jelas aman."""
+    texts = [PHISHING, BENIGN]
+    _, dates, bodies, _ = parse_emails(texts)
+    X = engine.pipeline.transform(bodies, engine.pipeline.metadata(dates, bodies))
+    xgb_prob = engine.xgb.predict_proba(X)[:, 1]
+    step = np.where(projected_iso.predict(X) == -1, 0.90, 0.10)
+
+    original, engine.iso = engine.iso, projected_iso
+    try:
+        final_score, _, iso_score = engine.score_many(texts)
+    finally:
+        engine.iso = original
+    np.testing.assert_allclose(iso_score, projected_iso.anomaly_score(X))
+    # Verdict versi biner 0.90/0.10 sebelumnya
+    expected = (xgb_prob * 0.8 + step * 0.2) * 100 > threshold
+    assert list(final_score * 100 > threshold) == list(expected) == [True, False]
+
+
+def test_predict_many_matches_predict(engine):
+    """Satu batch (dengan duplikat) memberi skor yang sama dengan predict per email."""
+    texts = [PHISHING, BENIGN, PHISHING] + make_emails(20, seed=3)['message'].tolist()
+    final_score, dims = engine.predict_many(texts, screen=False)
+    assert final_score.shape == (len(texts),) and dims.shape == (len(texts), 5)
+    for text, score, row in zip(texts, final_score, dims):
+        single_score, single_dims = engine.predict(text, screen=False)
+        np.testing.assert_allclose(score, single_score, rtol=1e-6)
+        # Dimensi memuat noise uniform [0, 0.05)
+        np.testing.assert_allclose(row, list(single_dims.values()), atol=0.05)
+    empty_score, empty_dims = engine.predict_many([])
+    assert empty_score.shape == (0,) and empty_dims.shape == (0, 5)
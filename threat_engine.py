@@ -0,0 +1,279 @@
+"""
+Backend engine untuk aplikasi Streamlit (dipisah dari app_uas_final.py agar
+bisa dipakai ulang tanpa harus menjalankan UI).
+"""
+import os
+import time
+
+import numpy as np
+
+from domain_blocklist import DomainBlocklist
+from feature_pipeline import FeaturePipeline, parse_emails
+from keywords import DIMENSION_KEYWORDS, KEYWORD_MATCHER
+from model_registry import ArtifactError, ModelRegistry
+from result_cache import DEFAULT_MAXSIZE, DEFAULT_TTL, ResultCache, content_key
+from soar import sender_domain
+from telemetry import Telemetry, process_memory
+
+# Set THREAT_ENGINE_ALLOW_TRAIN=1 agar engine melatih model mini bila artefak tidak tersedia
+ALLOW_TRAIN_ENV = 'THREAT_ENGINE_ALLOW_TRAIN'
+
+# Urutan kolom matriks dimensi dari predict_many
+DIMENSIONS = list(DIMENSION_KEYWORDS) + ['Social Eng']
+
+# (final_score, xgb_prob, iso_score) untuk email dari domain yang ada di blocklist
+BLOCKLIST_SCORES = (1.0, 1.0, 0.90)
+
+
+class PremiumThreatEngine:
+    def __init__(self, registry=None, allow_train=None, cache_size=DEFAULT_MAXSIZE, cache_ttl=DEFAULT_TTL,
+                 blocklist=True):
+        if allow_train is None:
+            allow_train = os.environ.get(ALLOW_TRAIN_ENV) == '1'
+        self.registry = registry or ModelRegistry()
+        self.telemetry = Telemetry()
+        # cache_size=0 menonaktifkan cache hasil (mis. untuk benchmark)
+        self.cache = ResultCache(cache_size, cache_ttl) if cache_size else None
+        # blocklist=True memakai domain_blocklist.db default, False menonaktifkan,
+        # atau berikan instance DomainBlocklist sendiri
+        if blocklist is True:
+            blocklist = DomainBlocklist()
+        self.blocklist = blocklist if blocklist not in (False, None) else None
+        try:
+            self._load_models()
+            self.source = 'artifacts'
+        except ArtifactError:
+            if not allow_train:
+                raise
+            self._train_models()
+            self.source = 'trained'
+            self.fingerprint = 'trained'
+
+    def _load_models(self):
+        # Artefak Enron (Cell 11): TF-IDF 5000 fitur + 4 metadata hasil MinMaxScaler
+        self.registry.validate()
+        self.fingerprint = self.registry.fingerprint()
+        self.vectorizer = self.registry.get('vectorizer')
+        self.scaler = self.registry.get('scaler')
+        self.xgb = self.registry.get('xgb')
+        self.iso = self.registry.get('iso')
+        self.pipeline = FeaturePipeline(self.vectorizer, self.scaler)
+
+    def _train_models(self):
+        from sklearn.ensemble import IsolationForest
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from xgboost import XGBClassifier
+
+        # Dataset diperkaya untuk akurasi lebih baik pada kasus edge cases
+        data = [
+            "urgent transfer funds immediately bank account",
+            "verify password security alert login",
+            "suspended account click link below",
+            "kill destroy ruin your career warning",
+            "lottery winner claim prize money",
+            "invoice attached please pay immediately",
+            "final warning legal action account seizure", # Specific for your case
+            "money laundering illegal transactions crime",
+            "identity theft detected contact support",
+            "permanent seizure blacklisting national id",
+            "legal report cyber crime unit arrest",
+            "quarterly financial report attached review",
+            "meeting scheduled for tomorrow lunch",
+            "project forecast update spreadsheet",
+            "hello friend how are you doing",
+            "attached is the invoice for design services",
+            "can we reschedule call next week",
+            "policy update remote work guidelines",
+            "happy birthday hope you have fun"
+        ]
+        labels = [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0]
+
+        self.vectorizer = TfidfVectorizer(max_features=1000, stop_words='english', ngram_range=(1,2))
+        X = self.vectorizer.fit_transform(data)
+        # Model mini hanya memakai fitur teks (tanpa clean_text dan metadata)
+        self.scaler = None
+        self.pipeline = FeaturePipeline(self.vectorizer, clean=False)
+
+        self.xgb = XGBClassifier(eval_metric='logloss', use_label_encoder=False)
+        self.xgb.fit(X, labels)
+
+        self.iso = IsolationForest(contamination=0.1, random_state=42)
+        self.iso.fit(X)
+
+    def _anomaly_scores(self, X):
+        if self.iso is None:
+            return np.full(X.shape[0], 0.10)
+        if hasattr(self.iso, 'anomaly_score'):
+            # Mode proyeksi (anomaly.py): skor kontinu lewat threshold hasil tuning Cell 8
+            return self.iso.anomaly_score(X)
+        # decision_function < 0 identik dengan iso.predict == -1
+        return np.where(self.iso.decision_function(X) < 0, 0.90, 0.10)
+
+    def _score(self, bodies, meta):
+        """Matriks (N x 3) final_score, xgb_prob, iso_score tanpa cache."""
+        n = len(bodies)
+        with self.telemetry.stage('vectorize', n):
+            X = self.pipeline.transform(bodies, meta)
+        with self.telemetry.stage('xgboost', n):
+            xgb_prob = self.xgb.predict_proba(X)[:, 1]
+        with self.telemetry.stage('isolation_forest', n):
+            iso_score = self._anomaly_scores(X)
+
+        # Weighted Ensemble: 80% XGBoost + 20% Anomaly
+        # iso_score kontinu tetap di 0.10..0.90 seperti versi biner, sisi yang sama dari threshold
+        # anomali; final_score bergeser paling banyak 0.08 (0.2 x 0.4), sehingga threshold slider
+        # tidak di-tuning ulang: verdict hanya bisa berubah bila final_score dalam 8 poin dari threshold
+        final_score = (xgb_prob * 0.8) + (iso_score * 0.2)
+        return np.column_stack([final_score, xgb_prob, iso_score])
+
+    def blocked_domains(self, senders):
+        """Per header From: domain pengirim bila ada di blocklist, selain itu None."""
+        senders = list(senders)
+        if self.blocklist is None:
+            return [None] * len(senders)
+        with self.telemetry.stage('blocklist', len(senders)):
+            domains = [sender_domain(s) for s in senders]
+            return [d if hit else None for d, hit in zip(domains, self.blocklist.match_many(domains))]
+
+    def _blocklisted(self, senders, n):
+        """List bool: domain header From email ke-i ada di blocklist (tanpa sender = False)."""
+        if senders is None:
+            return [False] * n
+        return [d is not None for d in self.blocked_domains(senders)]
+
+    def screen(self, text):
+        """
+        Jalur cepat untuk satu email mentah: domain pengirim (header From) bila
+        ada di blocklist (scan dianggap selesai dan dicatat), selain itu None.
+        Alamat yang hanya muncul di body tidak diperiksa.
+        """
+        if self.blocklist is None:
+            return None
+        domain = self.blocked_domains(parse_emails([text])[3])[0]
+        if domain is not None:
+            self.telemetry.record_scan()
+        return domain
+
+    def score_many(self, texts, meta=None, screen=True, senders=None):
+        """
+        Skor ensemble untuk banyak email sekaligus: `texts` email mentah
+        (meta=None) atau body yang sudah diparsing beserta metadata mentah (N x 4)
+        dan header From mentah (`senders`, opsional).
+        Email yang domain pengirimnya ada di blocklist langsung diberi
+        BLOCKLIST_SCORES (screen=False bila sudah diperiksa lewat `screen`);
+        dari sisanya hanya teks unik yang belum ada di cache yang di-score.
+        Return (final_score, xgb_prob, iso_score) sebagai array numpy.
+        """
+        texts = list(texts)
+        if meta is None:
+            _, dates, texts, parsed_senders = parse_emails(texts)
+            meta = self.pipeline.metadata(dates, texts)
+            senders = parsed_senders if senders is None else senders
+        elif self.pipeline.scaler is None:
+            meta = None
+        else:
+            meta = np.asarray(meta, dtype=np.float64)
+        return self._score_parsed(texts, meta, self._blocklisted(senders if screen else None, len(texts)))
+
+    def score_screened(self, texts):
+        """
+        score_many untuk email mentah (satu kali parsing) yang juga mengembalikan
+        domain pengirim yang terkena blocklist per email (None bila tidak).
+        Return (final_score, xgb_prob, iso_score, domains).
+        """
+        _, dates, bodies, senders = parse_emails(list(texts))
+        domains = self.blocked_domains(senders)
+        final_score, xgb_prob, iso_score = self._score_parsed(
+            bodies, self.pipeline.metadata(dates, bodies), [d is not None for d in domains])
+        return final_score, xgb_prob, iso_score, domains
+
+    def _score_parsed(self, texts, meta, blocked):
+        """Skor body yang sudah diparsing; baris `blocked` diberi BLOCKLIST_SCORES."""
+        results = np.empty((len(texts), 3))
+        normalize = self.pipeline.normalize
+        todo = {}
+        for i, text in enumerate(texts):
+            if blocked[i]:
+                results[i] = BLOCKLIST_SCORES
+                continue
+            key = content_key(normalize(text), None if meta is None else meta[i], self.fingerprint)
+            if key in todo:
+                todo[key].append(i)
+                continue
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is None:
+                todo[key] = [i]
+            else:
+                results[i] = cached
+
+        if todo:
+            first = [rows[0] for rows in todo.values()]
+            scored = self._score([texts[i] for i in first], None if meta is None else meta[first])
+            for (key, rows), row in zip(todo.items(), scored):
+                results[rows] = row
+                if self.cache is not None:
+                    self.cache.put(key, row)
+        self.telemetry.record_scan(len(texts))
+        # predict_proba XGBoost selalu float32; kembalikan dtype aslinya
+        return results[:, 0], results[:, 1].astype(np.float32), results[:, 2]
+
+    def _dimension_matrix(self, texts, risk_scores):
+        """Matriks (N x 5) skor dimensi, urutan kolom mengikuti DIMENSIONS."""
+        hits = KEYWORD_MATCHER.flags(texts, list(DIMENSION_KEYWORDS))
+        risk = np.asarray(risk_scores, dtype=float)[:, None]
+
+        base = np.where(hits, 1.0, 0.05)
+        # Intelligence Scaling: Dimensi mengikuti Main Risk Score
+        noise = np.random.uniform(0, 0.05, size=(len(texts), len(DIMENSIONS)))
+        dims = np.empty((len(texts), len(DIMENSIONS)))
+        dims[:, :-1] = base * risk + noise[:, :-1]
+        dims[:, -1:] = risk + noise[:, -1:]
+        return np.minimum(dims, 1.0)
+
+    def analyze_dimensions_many(self, texts, risk_scores):
+        """Versi batch dari analyze_dimensions: matriks (N x 5), kolom = DIMENSIONS."""
+        with self.telemetry.stage('dimensions', len(texts)):
+            return self._dimension_matrix(texts, risk_scores)
+
+    def analyze_dimensions(self, text, risk_score):
+        row = self._dimension_matrix([text], [risk_score])[0]
+        return dict(zip(DIMENSIONS, row))
+
+    def predict_many(self, texts, meta=None, screen=True, senders=None):
+        """
+        Versi batch dari predict: satu transform, satu panggilan XGBoost dan
+        satu panggilan IsolationForest untuk seluruh batch.
+        Return (final_scores[N], dims[N x 5]) dengan kolom dims = DIMENSIONS.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.empty(0), np.empty((0, len(DIMENSIONS)))
+        start = time.perf_counter()
+        final_score, _, _ = self.score_many(texts, meta, screen, senders)
+        dims = self.analyze_dimensions_many(texts, final_score)
+        self.telemetry.record('total', time.perf_counter() - start, len(texts))
+        return final_score, dims
+
+    def predict(self, text, screen=True):
+        final_score, dims = self.predict_many([text], screen=screen)
+        return final_score[0], dict(zip(DIMENSIONS, dims[0]))
+
+    def memory(self):
+        """Perkiraan memori: artefak model (ukuran pickle) dan RSS proses, dalam byte."""
+        footprint = self.registry.footprint() if self.source == 'artifacts' else {}
+        return {'models': footprint, 'models_total': sum(footprint.values()), 'process_rss': process_memory()}
+
+    def metrics_text(self):
+        """Metrik format teks Prometheus untuk telemetry.serve_metrics."""
+        memory = self.memory()
+        gauges = {'model_bytes': memory['models_total']}
+        if self.cache is not None:
+            stats = self.cache.stats()
+            gauges.update({'cache_hits': stats['hits'], 'cache_misses': stats['misses'], 'cache_size': stats['size']})
+        if self.blocklist is not None:
+            stats = self.blocklist.stats()
+            gauges.update({'blocklist_entries': stats['entries'], 'blocklist_lookups': stats['lookups'],
+                           'blocklist_hits': stats['hits'], 'blocklist_bloom_rejects': stats['bloom_rejects']})
+        if memory['process_rss'] is not None:
+            gauges['process_rss_bytes'] = memory['process_rss']
+        return self.telemetry.prometheus(gauges)
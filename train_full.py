@@ -0,0 +1,606 @@
+"""
+Training out-of-core pada seluruh korpus Enron (~517k email) plus arsip
+sendiri, tanpa memuat X_train_final ke memori.
+
+Notebook Cell 1-8 membatasi ingest ke NROWS=100000 karena TF-IDF, split, dan
+XGBoost bekerja pada matriks penuh di RAM. Di sini semua tahap berjalan per
+chunk dari cache korpus (`corpus_cache.py`):
+
+1. Ingest      : setiap CSV disinkronkan ke cache (hanya email baru yang diparsing).
+2. Split       : 70:30 stratified (random_state=42) hanya dari kolom date + warning.
+3. Vocabulary  : lintasan streaming atas clean_text data latih menghitung frekuensi
+                 term (paralel per chunk); 5000 term teratas dipilih dengan aturan
+                 yang sama seperti TfidfVectorizer(max_features=5000). MinMaxScaler
+                 di-fit dengan partial_fit pada metadata.
+4. Shard       : lintasan kedua menulis count matrix CSR per chunk ke disk dan
+                 menghitung document frequency -> idf_.
+5. XGBoost     : shard dibaca lewat `xgboost.DataIter` (TF-IDF + metadata dibentuk
+                 per shard dengan FeaturePipeline) ke `ExtMemQuantileDMatrix`
+                 (`tree_method='hist'`, semua core), parameter sama dengan Cell 7.
+6. Anomali     : ProjectedIsolationForest dilatih pada sampel acak data latih
+                 (IsolationForest hanya memakai 256 sampel per pohon), threshold
+                 di-tuning F1 pada data uji seperti Cell 8.
+
+Ukuran chunk, jumlah worker, batas jumlah term di penghitung vocabulary, dan
+max_bin XGBoost dihitung dari `--memory-mb` sebelum setiap tahap, dikurangi
+memori yang sudah dipegang proses utama, agar RSS puncak (proses utama +
+worker) tetap di bawah budget. Selain itu RSS diperiksa per chunk / shard di
+dalam setiap loop; begitu estimasinya melewati budget, run dihentikan dengan
+MemoryBudgetExceeded (naikkan `--memory-mb` atau kurangi `--workers`).
+Vocabulary identik dengan fit di memori selama penghitung term tidak perlu
+dipangkas.
+
+    python train_full.py emails.csv archive.csv --out artifacts_full --memory-mb 2048
+    THREAT_ENGINE_ARTIFACTS=artifacts_full streamlit run app_uas_final.py
+
+    train_full/                        (--work-dir)
+      shards/train/000001.npz          count matrix CSR per chunk
+      shards/train/000001.labels.npz   metadata mentah + label
+      xgb_cache/                       halaman external memory XGBoost
+"""
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+
+from corpus_cache import CACHE_DIR, CorpusCache
+from email_ingest import ordered_map
+from features import META_COLUMNS, load_stop_words
+
+DEFAULT_OUT = 'artifacts_full'
+DEFAULT_WORK_DIR = 'train_full'
+DEFAULT_MEMORY_MB = 2048
+
+MAX_FEATURES = 5000
+
+# Parameter Cell 7 (XGBClassifier) dalam bentuk xgboost.train
+XGB_PARAMS = {
+    'objective': 'binary:logistic',
+    'learning_rate': 0.1,
+    'max_depth': 6,
+    'eval_metric': 'logloss',
+    'seed': 42,
+    'tree_method': 'hist',
+}
+N_ROUNDS = 200
+
+# Perkiraan memori puncak per baris yang sedang diproses (teks, token, CSR sementara)
+ROW_COST_BYTES = 32_000
+# RSS dasar proses utama / satu worker process (interpreter + pandas + sklearn + xgboost)
+MAIN_BASE_BYTES = 300e6
+WORKER_BASE_BYTES = 200e6
+MIN_CHUNK_ROWS, MAX_CHUNK_ROWS = 1000, 50000
+# Perkiraan memori per entri penghitung term (string + int di dict)
+TERM_COST_BYTES = 200
+# Histogram `hist` XGBoost per (kolom x bin): gradient + hessian (2 x float64) untuk
+# hingga 32 node satu level (max_depth=6), tidak bergantung jumlah baris
+HIST_BYTES_PER_BIN = 600
+MAX_BIN_CHOICES = (256, 128, 64, 32)
+
+
+# ----------------------------------------------------------------------------
+# Budget memori
+# ----------------------------------------------------------------------------
+class MemoryBudgetExceeded(RuntimeError):
+    """RSS puncak training melewati `--memory-mb`."""
+
+
+def peak_rss_mb():
+    """(proses utama, worker terbesar) RSS puncak dalam MB, None bila tidak tersedia."""
+    try:
+        import resource
+    except ImportError:
+        return None, None
+    # ru_maxrss dalam KB di Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024)
+
+
+def current_rss_mb():
+    """RSS proses utama saat ini dalam MB (Linux /proc), None bila tidak tersedia."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class MemoryPlan:
+    """
+    Ukuran chunk, worker, batas penghitung term, dan max_bin XGBoost yang muat
+    dalam `memory_mb`. Pada tahap ingest/vocabulary/shard, setengah budget untuk
+    worker + chunk yang sedang diproses (ordered_map menahan maksimal 2 x workers
+    chunk, ditambah satu di proses utama) dan seperempat untuk penghitung term.
+    Saat training XGBoost tidak ada worker; memorinya didominasi histogram
+    (kolom x max_bin), sehingga max_bin dipilih sebesar mungkin (256 = default
+    Cell 7) yang masih muat dalam budget.
+
+    `resize` dipanggil sebelum setiap tahap: memori yang sudah dipegang proses
+    utama (di atas RSS dasarnya) dikurangkan dari budget sebelum ukuran dihitung
+    ulang. `check` dipanggil per chunk / shard di dalam setiap loop dan
+    menghentikan run begitu estimasi RSS puncak melewati budget.
+    """
+
+    def __init__(self, memory_mb=DEFAULT_MEMORY_MB, workers=None):
+        self.memory_mb = memory_mb
+        self.requested_workers = workers
+        # RSS puncak proses utama selama tahap paralel; None = worker masih dipakai
+        self.main_during_workers = None
+        self.peak_workers = 0
+        self.resize()
+
+    def _room_bytes(self):
+        """Budget dikurangi memori yang sudah dipegang proses utama di atas MAIN_BASE_BYTES."""
+        held = max(0.0, (current_rss_mb() or 0) * 2 ** 20 - MAIN_BASE_BYTES)
+        return self.memory_mb * 1e6 - held
+
+    def resize(self, stage=None):
+        """Hitung ulang worker, chunk_rows, dan max_terms dari sisa budget sebelum `stage`."""
+        budget = self._room_bytes()
+        per_worker = WORKER_BASE_BYTES + 3 * MIN_CHUNK_ROWS * ROW_COST_BYTES
+        if budget / 2 < per_worker:
+            where = f"sebelum tahap '{stage}'" if stage else 'di awal training'
+            raise MemoryBudgetExceeded(f"Sisa budget {max(budget, 0) / 1e6:,.0f} MB {where} tidak cukup untuk "
+                                       f"satu worker (naikkan --memory-mb)")
+        self.workers = max(1, min(self.requested_workers or os.cpu_count() or 1, int(budget / 2 // per_worker)))
+        self.peak_workers = max(self.peak_workers, self.workers)
+        chunk_budget = budget / 2 - self.workers * WORKER_BASE_BYTES
+        self.chunk_rows = int(np.clip(chunk_budget / ((2 * self.workers + 1) * ROW_COST_BYTES),
+                                      MIN_CHUNK_ROWS, MAX_CHUNK_ROWS))
+        self.max_terms = max(4 * MAX_FEATURES, int(budget / 4 / TERM_COST_BYTES))
+        if stage is not None:
+            print(f"[INFO] {stage}: {self}")
+        return self
+
+    def end_parallel(self):
+        """Tandai akhir tahap dengan worker process (ingest/vocabulary/shard)."""
+        self.main_during_workers = peak_rss_mb()[0]
+
+    def estimated_peak_mb(self):
+        """
+        Batas atas RSS puncak (MB): semua worker mencapai puncaknya bersamaan di
+        atas RSS puncak proses utama selama tahap paralel. None bila tidak tersedia.
+        """
+        rss_main, rss_workers = peak_rss_mb()
+        if rss_main is None:
+            return None
+        base = rss_main if self.main_during_workers is None else self.main_during_workers
+        return max(rss_main, base + self.peak_workers * (rss_workers or 0))
+
+    def check(self, stage):
+        """Hentikan run bila estimasi RSS puncak selama `stage` melewati budget."""
+        peak = self.estimated_peak_mb()
+        if peak is not None and peak > self.memory_mb:
+            raise MemoryBudgetExceeded(f"RSS puncak {peak:,.0f} MB pada tahap '{stage}' melewati budget "
+                                       f"{self.memory_mb:,} MB (naikkan --memory-mb atau kurangi --workers)")
+
+    def max_bin(self, n_features):
+        room = self.memory_mb * 1e6 - max(MAIN_BASE_BYTES, (current_rss_mb() or 0) * 2 ** 20)
+        for max_bin in MAX_BIN_CHOICES:
+            if n_features * max_bin * HIST_BYTES_PER_BIN <= room:
+                return max_bin
+        return MAX_BIN_CHOICES[-1]
+
+    def __repr__(self):
+        return (f"MemoryPlan(memory_mb={self.memory_mb}, workers={self.workers}, "
+                f"chunk_rows={self.chunk_rows:,}, max_terms={self.max_terms:,})")
+
+
+# ----------------------------------------------------------------------------
+# Iterasi korpus per chunk
+# ----------------------------------------------------------------------------
+def iter_chunks(cache, columns, chunk_rows):
+    """Yield (posisi baris global, DataFrame) per chunk, urut sesuai segmen cache."""
+    import pyarrow.parquet as pq
+
+    offset = 0
+    for seg in cache.segments():
+        for batch in pq.ParquetFile(seg, memory_map=True).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield np.arange(offset, offset + batch.num_rows), batch.to_pandas()
+            offset += batch.num_rows
+
+
+def split_rows(cache, hashes=None, test_size=0.3, random_state=42):
+    """
+    Array kode per baris cache: 0 = tidak dipakai, 1 = latih, 2 = uji.
+    Split sama dengan Cell 4 (stratified 70:30), dihitung hanya dari date + warning.
+    """
+    from sklearn.model_selection import train_test_split
+
+    df = cache.load(columns=['date', 'warning'])
+    valid = df['date'].notna().to_numpy()
+    if hashes is not None:
+        valid = valid & df['hash'].isin(set(hashes)).to_numpy()
+    rows = np.flatnonzero(valid)
+    train, test = train_test_split(rows, test_size=test_size, random_state=random_state,
+                                   stratify=df['warning'].to_numpy()[rows])
+    split = np.zeros(len(df), dtype=np.int8)
+    split[train] = 1
+    split[test] = 2
+    return split, df['warning'].to_numpy()
+
+
+# ----------------------------------------------------------------------------
+# Lintasan 1: vocabulary + scaler
+# ----------------------------------------------------------------------------
+def _term_frequencies(texts):
+    """Frekuensi total setiap term dalam satu chunk (dijalankan di worker process)."""
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    cv = CountVectorizer()
+    try:
+        counts = cv.fit_transform(texts)
+    except ValueError:
+        # Chunk tanpa token sama sekali
+        return [], np.zeros(0, dtype=np.int64)
+    return cv.get_feature_names_out().tolist(), np.asarray(counts.sum(axis=0)).ravel()
+
+
+def _prune(counts, keep):
+    """Buang term dengan frekuensi terendah sampai tersisa ~`keep` term."""
+    values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    cutoff = np.partition(values, len(values) - keep)[len(values) - keep]
+    return {t: c for t, c in counts.items() if c > cutoff}
+
+
+def learn_vocabulary(cache, split, plan, max_features=MAX_FEATURES):
+    """
+    Lintasan streaming atas data latih. Return (vocabulary_, scaler, info).
+    Pemilihan term sama dengan TfidfVectorizer(max_features): frekuensi total
+    terbesar, lalu indeks kolom diurutkan alfabetis.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler()
+    counts = {}
+    pruned = 0
+
+    def tasks():
+        for rows, df in iter_chunks(cache, ['clean_text'] + META_COLUMNS, plan.chunk_rows):
+            train = split[rows] == 1
+            if train.any():
+                scaler.partial_fit(df.loc[train, META_COLUMNS])
+                yield (df.loc[train, 'clean_text'].tolist(),)
+
+    for terms, freq in ordered_map(_term_frequencies, tasks(), plan.workers):
+        plan.check('vocabulary')
+        get = counts.get
+        for term, n in zip(terms, freq.tolist()):
+            counts[term] = get(term, 0) + n
+        if len(counts) > plan.max_terms:
+            counts = _prune(counts, plan.max_terms // 2)
+            pruned += 1
+
+    # Langkah CountVectorizer._limit_features: term diurutkan alfabetis, lalu argsort
+    # frekuensi (float64, seperti TfidfVectorizer) sehingga urutan term dengan
+    # frekuensi sama juga identik
+    terms = sorted(counts)
+    tfs = np.array([counts[t] for t in terms], dtype=np.float64)
+    del counts
+    keep = np.sort((-tfs).argsort()[:max_features])
+    vocabulary = {terms[j]: i for i, j in enumerate(keep)}
+    return vocabulary, scaler, {'terms_seen': len(terms), 'counter_prunes': pruned, 'vocabulary_exact': pruned == 0}
+
+
+# ----------------------------------------------------------------------------
+# Lintasan 2: shard count matrix
+# ----------------------------------------------------------------------------
+def _write_shard(texts, meta, labels, vocabulary, path, split_code):
+    """Tulis count matrix CSR + metadata + label satu chunk. Return (split_code, baris, document frequency)."""
+    from scipy.sparse import save_npz
+    from sklearn.feature_extraction.text import CountVectorizer
+
+    counts = CountVectorizer(vocabulary=vocabulary, dtype=np.float32).transform(texts).tocsr()
+    save_npz(path + '.npz', counts, compressed=False)
+    np.savez(path + '.labels.npz', meta=meta, labels=labels)
+    return split_code, counts.shape[0], np.bincount(counts.indices, minlength=len(vocabulary))
+
+
+def write_shards(cache, split, vocabulary, plan, shard_dir):
+    """Tulis shard train/ dan test/. Return (path shard latih, path shard uji, df, n_docs latih)."""
+    for name in ('train', 'test'):
+        shutil.rmtree(os.path.join(shard_dir, name), ignore_errors=True)
+        os.makedirs(os.path.join(shard_dir, name))
+
+    paths = {1: [], 2: []}
+
+    def tasks():
+        for rows, df in iter_chunks(cache, ['clean_text', 'warning'] + META_COLUMNS, plan.chunk_rows):
+            for code, name in ((1, 'train'), (2, 'test')):
+                mask = split[rows] == code
+                if not mask.any():
+                    continue
+                part = df.loc[mask]
+                path = os.path.join(shard_dir, name, f'{len(paths[code]) + 1:06d}')
+                paths[code].append(path)
+                yield (part['clean_text'].tolist(), part[META_COLUMNS].to_numpy(dtype=np.float64),
+                       part['warning'].to_numpy(dtype=np.int8), vocabulary, path, code)
+
+    df_train = np.zeros(len(vocabulary), dtype=np.int64)
+    n_train = 0
+    for code, n_rows, df in ordered_map(_write_shard, tasks(), plan.workers):
+        plan.check('shards')
+        if code == 1:
+            df_train += df
+            n_train += n_rows
+    return paths[1], paths[2], df_train, n_train
+
+
+def build_vectorizer(vocabulary, df, n_docs):
+    """TfidfVectorizer(max_features=5000) terlatih dari vocabulary + document frequency (smooth idf)."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(max_features=MAX_FEATURES)
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer.idf_ = np.log((1 + n_docs) / (1 + df)) + 1
+    return vectorizer
+
+
+def load_shard(path, pipeline):
+    """(X final CSR, label) satu shard: count -> TF-IDF (idf_ vectorizer) -> + metadata."""
+    from scipy.sparse import load_npz
+    from sklearn.preprocessing import normalize
+
+    counts = load_npz(path + '.npz').astype(np.float64)
+    with np.load(path + '.labels.npz') as extra:
+        meta, labels = extra['meta'], extra['labels']
+    # Langkah yang sama dengan TfidfVectorizer.transform setelah menghitung term
+    # (tf mentah x idf_, lalu normalisasi baris sesuai vectorizer.norm)
+    vectorizer = pipeline.vectorizer
+    X_text = normalize(counts.multiply(vectorizer.idf_).tocsr(), norm=vectorizer.norm, copy=False)
+    return pipeline.combine(X_text, meta), labels
+
+
+# ----------------------------------------------------------------------------
+# XGBoost external memory
+# ----------------------------------------------------------------------------
+def shard_iterator(paths, pipeline, cache_prefix, plan=None):
+    import xgboost as xgb
+
+    class ShardIterator(xgb.DataIter):
+        def __init__(self):
+            self._i = 0
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data):
+            if self._i == len(paths):
+                return False
+            if plan is not None:
+                plan.check('xgboost')
+            X, y = load_shard(paths[self._i], pipeline)
+            input_data(data=X, label=y)
+            self._i += 1
+            return True
+
+        def reset(self):
+            self._i = 0
+
+    return ShardIterator()
+
+
+def train_xgboost(paths, pipeline, scale_pos_weight, cache_dir, n_jobs=-1, n_rounds=N_ROUNDS, max_bin=256,
+                  plan=None):
+    """XGBClassifier (parameter Cell 7) dari shard lewat ExtMemQuantileDMatrix."""
+    import xgboost as xgb
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.makedirs(cache_dir)
+    dtrain = xgb.ExtMemQuantileDMatrix(shard_iterator(paths, pipeline, os.path.join(cache_dir, 'train'), plan),
+                                       nthread=n_jobs, max_bin=max_bin)
+    params = dict(XGB_PARAMS, scale_pos_weight=scale_pos_weight, nthread=n_jobs, max_bin=max_bin)
+    booster = xgb.train(params, dtrain, num_boost_round=n_rounds)
+
+    # Bungkus sebagai XGBClassifier agar engine/app tetap memakai predict_proba
+    model = xgb.XGBClassifier(n_estimators=n_rounds, learning_rate=0.1, max_depth=6,
+                              scale_pos_weight=scale_pos_weight, eval_metric='logloss',
+                              random_state=42, n_jobs=n_jobs, tree_method='hist', max_bin=max_bin)
+    model.load_model(bytearray(booster.save_raw('ubj')))
+    del dtrain
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    return model
+
+
+def evaluate(model, paths, pipeline, plan=None):
+    """Metrik Cell 7 pada shard uji (streaming). Return (metrics, label uji)."""
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+
+    ys, probs = [], []
+    for path in paths:
+        if plan is not None:
+            plan.check('evaluate')
+        X, y = load_shard(path, pipeline)
+        ys.append(y)
+        probs.append(model.predict_proba(X)[:, 1])
+    y, prob = np.concatenate(ys), np.concatenate(probs)
+    pred = (prob >= 0.5).astype(int)
+    metrics = {
+        'accuracy': accuracy_score(y, pred),
+        'precision': precision_score(y, pred),
+        'recall': recall_score(y, pred),
+        'f1': f1_score(y, pred),
+        'roc_auc': roc_auc_score(y, prob),
+    }
+    return metrics, y
+
+
+def sample_rows(paths, pipeline, n_sample, n_total, random_state=42, plan=None):
+    """Sampel acak ~n_sample baris dari shard (proporsional per shard)."""
+    from scipy.sparse import vstack
+
+    rng = np.random.default_rng(random_state)
+    fraction = min(1.0, n_sample / max(n_total, 1))
+    parts = []
+    for path in paths:
+        if plan is not None:
+            plan.check('isolation_forest')
+        X, _ = load_shard(path, pipeline)
+        parts.append(X[rng.random(X.shape[0]) < fraction])
+    return vstack(parts, format='csr')
+
+
+def train_anomaly(train_paths, test_paths, y_test, pipeline, n_train, n_sample=100000, plan=None):
+    """ProjectedIsolationForest (Cell 8) pada sampel data latih, threshold di-tuning F1 pada data uji."""
+    from sklearn.metrics import precision_recall_curve
+
+    from anomaly import ProjectedIsolationForest
+
+    X = sample_rows(train_paths, pipeline, n_sample, n_train, plan=plan)
+    # Random projection sparse: hanya sebagian term dipakai, sehingga compact_model tetap bisa memangkas vocabulary
+    iso = ProjectedIsolationForest(n_components=min(32, X.shape[1] - 1), projection='random', n_estimators=100,
+                                   contamination=0.05, random_state=42, n_jobs=-1)
+    iso.fit(X)
+    del X
+    scores = np.concatenate([-iso.decision_function(load_shard(p, pipeline)[0]) for p in test_paths])
+    precisions, recalls, thresholds = precision_recall_curve(y_test, scores)
+    denom = precisions + recalls
+    f1_scores = np.divide(2 * precisions * recalls, denom, out=np.zeros_like(denom), where=denom > 0)
+    best_idx = np.argmax(f1_scores[:-1])
+    iso.set_threshold(thresholds[best_idx])
+    return iso, float(f1_scores[best_idx])
+
+
+# ----------------------------------------------------------------------------
+# Entry point
+# ----------------------------------------------------------------------------
+def train_full(csv_paths=(), out_dir=DEFAULT_OUT, work_dir=DEFAULT_WORK_DIR, cache_dir=CACHE_DIR,
+               memory_mb=DEFAULT_MEMORY_MB, workers=None, nrows=None, n_jobs=-1, iso_sample=100000,
+               stopwords_fallback=False):
+    """Jalankan seluruh training out-of-core dan tulis artefak + manifest ke `out_dir`. Return report (dict)."""
+    import joblib
+
+    from feature_pipeline import FeaturePipeline
+    from model_registry import ARTIFACT_FILES, write_manifest
+
+    plan = MemoryPlan(memory_mb, workers)
+    timings = {}
+    start = time.perf_counter()
+
+    def lap(name):
+        nonlocal start
+        now = time.perf_counter()
+        timings[name] = now - start
+        print(f"[INFO] {name}: {timings[name]:.1f}s, RSS puncak {peak_rss_mb()[0] or 0:,.0f} MB")
+        plan.check(name)
+        start = now
+
+    # 1. Ingest semua CSV ke cache korpus
+    plan.resize('ingest')
+    cache = CorpusCache(cache_dir, load_stop_words(stopwords_fallback))
+    hashes = None
+    if csv_paths:
+        hashes = []
+        for path in csv_paths:
+            order, stats = cache.update(path, chunksize=plan.chunk_rows, workers=plan.workers, nrows=nrows)
+            hashes.extend(order)
+            print(f"[INFO] {path}: {stats['rows']:,} email ({stats['new']:,} baru, {stats['cached']:,} dari cache)")
+    lap('ingest')
+
+    # 2. Split 70:30
+    split, labels = split_rows(cache, hashes)
+    n_train, n_test = int((split == 1).sum()), int((split == 2).sum())
+    train_labels = labels[split == 1]
+    scale_pos_weight = float(np.sum(train_labels == 0)) / np.sum(train_labels == 1)
+    print(f"[INFO] Split: {n_train:,} latih, {n_test:,} uji")
+    del labels, train_labels
+    lap('split')
+
+    # 3. Vocabulary + scaler (streaming)
+    plan.resize('vocabulary')
+    vocabulary, scaler, vocab_info = learn_vocabulary(cache, split, plan)
+    print(f"[INFO] Vocabulary: {len(vocabulary):,} dari {vocab_info['terms_seen']:,} term "
+          f"({'exact' if vocab_info['vocabulary_exact'] else 'counter dipangkas, mendekati'})")
+    lap('vocabulary')
+
+    # 4. Shard count matrix + idf
+    plan.resize('shards')
+    train_paths, test_paths, df, n_docs = write_shards(cache, split, vocabulary, plan,
+                                                       os.path.join(work_dir, 'shards'))
+    del split
+    vectorizer = build_vectorizer(vocabulary, df, n_docs)
+    pipeline = FeaturePipeline(vectorizer, scaler)
+    print(f"[INFO] Shard: {len(train_paths)} latih, {len(test_paths)} uji")
+    lap('shards')
+
+    # 5. XGBoost external memory
+    # Tahap 1-4 selesai: tidak ada worker lagi
+    plan.end_parallel()
+    max_bin = plan.max_bin(pipeline.n_features)
+    print(f"[INFO] XGBoost external memory: {len(train_paths)} batch, max_bin={max_bin}")
+    xgb_model = train_xgboost(train_paths, pipeline, scale_pos_weight, os.path.join(work_dir, 'xgb_cache'),
+                              n_jobs, max_bin=max_bin, plan=plan)
+    lap('xgboost')
+    metrics, y_test = evaluate(xgb_model, test_paths, pipeline, plan)
+    print("[INFO] XGBoost (data uji): " + ', '.join(f"{k}={v:.4f}" for k, v in metrics.items()))
+    lap('evaluate')
+
+    # 6. Isolation Forest pada sampel
+    iso_model = None
+    if iso_sample:
+        iso_model, iso_f1 = train_anomaly(train_paths, test_paths, y_test, pipeline, n_train, iso_sample, plan)
+        metrics['iso_f1'] = iso_f1
+        print(f"[INFO] Isolation Forest (sampel {iso_sample:,}): F1 tuned = {iso_f1:.4f}")
+        lap('isolation_forest')
+
+    # 7. Artefak (nama file sama dengan Cell 11)
+    os.makedirs(out_dir, exist_ok=True)
+    joblib.dump(xgb_model, os.path.join(out_dir, ARTIFACT_FILES['xgb']))
+    if iso_model is not None:
+        joblib.dump(iso_model, os.path.join(out_dir, ARTIFACT_FILES['iso']))
+    joblib.dump(vectorizer, os.path.join(out_dir, ARTIFACT_FILES['vectorizer']))
+    joblib.dump(scaler, os.path.join(out_dir, ARTIFACT_FILES['scaler']))
+
+    rss_main, rss_workers = peak_rss_mb()
+    total_rss = plan.estimated_peak_mb()
+    report = {
+        'rows_train': n_train,
+        'rows_test': n_test,
+        'memory_budget_mb': memory_mb,
+        'peak_rss_mb': round(total_rss, 1) if total_rss is not None else None,
+        'peak_main_rss_mb': round(rss_main, 1) if rss_main is not None else None,
+        'peak_worker_rss_mb': round(rss_workers, 1) if rss_workers is not None else None,
+        'chunk_rows': plan.chunk_rows,
+        'max_bin': max_bin,
+        'workers': plan.workers,
+        'timings_s': {k: round(v, 2) for k, v in timings.items()},
+        'metrics': {k: round(float(v), 4) for k, v in metrics.items()},
+        **vocab_info,
+    }
+    write_manifest(out_dir, n_text_features=len(vocabulary), training=report)
+    shutil.rmtree(os.path.join(work_dir, 'shards'), ignore_errors=True)
+
+    if total_rss is not None:
+        status = '[SUCCESS]' if total_rss <= memory_mb else '[WARNING]'
+        print(f"{status} RSS puncak {total_rss:,.0f} MB (utama {rss_main:,.0f} MB, {plan.workers} worker x "
+              f"{rss_workers:,.0f} MB), budget {memory_mb:,} MB")
+    total = sum(timings.values())
+    print(f"[SUCCESS] Artefak tersimpan di '{out_dir}' ({n_train + n_test:,} email, {total:.1f}s, "
+          f"{(n_train + n_test) / total:,.0f} email/s)")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('csv', nargs='*', help='emails.csv / arsip (kosong = seluruh isi cache korpus)')
+    parser.add_argument('--out', default=DEFAULT_OUT)
+    parser.add_argument('--work-dir', default=DEFAULT_WORK_DIR)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--memory-mb', type=int, default=DEFAULT_MEMORY_MB, help='budget RSS puncak')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--nrows', type=int, default=None, help='batasi baris per CSV (uji cepat)')
+    parser.add_argument('--iso-sample', type=int, default=100000, help='0 = tanpa Isolation Forest')
+    parser.add_argument('--stopwords-fallback', action='store_true',
+                        help='pakai stopwords sklearn bila korpus NLTK tidak ada (vocabulary berbeda dari notebook)')
+    args = parser.parse_args()
+    try:
+        train_full(args.csv, args.out, args.work_dir, args.cache_dir, args.memory_mb, args.workers, args.nrows,
+                   iso_sample=args.iso_sample, stopwords_fallback=args.stopwords_fallback)
+    except (MemoryBudgetExceeded, LookupError) as e:
+        raise SystemExit(f"[ERROR] {e}")
+
+
+if __name__ == '__main__':
+    # Worker process mengimpor fungsi dari modul ini, bukan dari __main__
+    from train_full import main as _main
+    _main()